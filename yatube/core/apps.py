@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from .sqlite import apply_pragmas
+        from .utils import make_log_dirs
+
+        connection_created.connect(
+            apply_pragmas, dispatch_uid='core.sqlite.apply_pragmas')
+        make_log_dirs()
@@ -0,0 +1,57 @@
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.views.decorators.cache import cache_page
+
+PAGE_VERSION_KEY = 'page_version:{}'
+# Семейство, в которое входят все страницы: его версию меняют массовые
+# правки (перерисовка разметки, перенос постов, переименования).
+ALL = 'all'
+
+
+def page_versions(families):
+    keys = [PAGE_VERSION_KEY.format(family) for family in (ALL, *families)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = time.time_ns()
+            cache.add(key, versions[key], None)
+    return '.'.join(str(versions[key]) for key in keys)
+
+
+def bump_page_version(*families, using=None):
+    """Сбрасывает страницы семейств families, без аргументов - все.
+
+    Новая версия - время в наносекундах, а не счётчик: если ключ версии
+    вытеснен из кэша, старые страницы всё равно не оживут. После COMMIT
+    версия меняется ещё раз: запрос, прочитавший данные до COMMIT, мог
+    успеть закэшировать страницу под новой версией.
+    """
+    keys = [PAGE_VERSION_KEY.format(family) for family in families or [ALL]]
+
+    def bump():
+        cache.set_many(dict.fromkeys(keys, time.time_ns()), None)
+
+    bump()
+    transaction.on_commit(bump, using=using)
+
+
+def versioned_cache_page(timeout, *families):
+    """cache_page с версиями семейств страницы в префиксе ключа.
+
+    Семейство - строка с полями из аргументов представления, например
+    'group:{slug}'. Страница общая для всех, пока представление и шаблон
+    не трогают сессию: иначе cache_page сам добавит Vary: Cookie.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            versions = page_versions(
+                [family.format(**kwargs) for family in families])
+            cached_view = cache_page(
+                timeout, key_prefix=f'page.{versions}')(view)
+            return cached_view(request, *args, **kwargs)
+        return wrapped
+    return decorator
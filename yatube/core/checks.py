@@ -0,0 +1,19 @@
+import os
+
+from django.core.checks import Warning, register
+
+from .utils import log_dirs
+
+
+@register('logging')
+def check_log_dirs(app_configs, **kwargs):
+    return [
+        Warning(
+            f'Каталог журналов {directory} недоступен для записи.',
+            hint='Создайте его или поправьте права; до этого записи '
+                 'соответствующих журналов теряются.',
+            id='core.W002',
+        )
+        for directory in sorted(log_dirs())
+        if not os.access(directory, os.W_OK)
+    ]
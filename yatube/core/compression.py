@@ -0,0 +1,60 @@
+import gzip
+import zlib
+
+import brotli
+
+# Сжимаем только текст: изображения и архивы уже сжаты.
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+
+def compress(data):
+    """Сжатые варианты содержимого для статики: (суффикс, данные)."""
+    return [
+        ('.gz', gzip.compress(data, 9, mtime=0)),
+        ('.br', brotli.compress(data)),
+    ]
+
+
+class BrotliCompressor:
+    """Потоковый компрессор brotli с интерфейсом zlib.compressobj."""
+
+    def __init__(self, quality):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.finish()
+
+
+# Поддерживаемые кодировки в порядке предпочтения.
+SUPPORTED_ENCODINGS = ('br', 'gzip')
+
+
+def compressor(encoding):
+    if encoding == 'br':
+        # Качество 5 близко к gzip -9 по скорости и заметно лучше сжимает.
+        return BrotliCompressor(quality=5)
+    return zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def compress_body(data, encoding):
+    engine = compressor(encoding)
+    return engine.compress(data) + engine.flush()
+
+
+def compress_stream(chunks, encoding):
+    """Сжимает поток по мере чтения, не собирая его в памяти."""
+    engine = compressor(encoding)
+    for chunk in chunks:
+        data = engine.compress(chunk)
+        if data:
+            yield data
+    yield engine.flush()
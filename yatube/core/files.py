@@ -0,0 +1,187 @@
+import mimetypes
+import os
+import re
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+# Предварительно сжатые копии в порядке предпочтения.
+COMPRESSED_VARIANTS = (('br', '.br'), ('gzip', '.gz'))
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class FileRange:
+    """Часть файла для FileResponse.
+
+    read() не выходит за границу диапазона, а fileno() и tell() позволяют
+    WSGI-серверу отправить её через sendfile со смещением.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def resolve(root, path):
+    """Абсолютный путь к файлу внутри root или Http404."""
+    try:
+        fullpath = safe_join(root, path)
+    except SuspiciousFileOperation:
+        raise Http404('Файл не найден')
+    if not os.path.isfile(fullpath):
+        raise Http404('Файл не найден')
+    return fullpath
+
+
+def snapshot_file(path):
+    """Имя файла снимка страницы: /group/g1/ -> group/g1/index.html."""
+    return os.path.join(path.strip('/'), 'index.html')
+
+
+def accepted_encodings(request):
+    """Кодировки из Accept-Encoding, кроме явно запрещённых через q=0."""
+    encodings = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        encoding, _, params = part.partition(';')
+        params = params.replace(' ', '')
+        if params in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        encodings.add(encoding.strip().lower())
+    return encodings
+
+
+def byte_range(request, size, etag, last_modified):
+    """Запрошенный диапазон байтов (start, end) включительно или None.
+
+    Поддерживается один диапазон; несколько диапазонов или устаревший
+    If-Range дают полный ответ. Диапазон за концом файла - ValueError.
+    """
+    header = request.META.get('HTTP_RANGE', '').replace(' ', '')
+    match = RANGE_RE.match(header)
+    if match is None or not any(match.groups()):
+        return None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range not in (etag, last_modified):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+        if not int(last):
+            start = size
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError('Диапазон вне файла')
+    return start, end
+
+
+def range_response(path, content_type, start, end, size):
+    """Ответ 206 с частью файла."""
+    length = end - start + 1
+    response = FileResponse(
+        FileRange(open(path, 'rb'), start, length),
+        content_type=content_type,
+        status=206,
+    )
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = length
+    return response
+
+
+def file_response(request, path, content_type=None, encoding=None,
+                  cache_control=REVALIDATE, ranges=False):
+    """FileResponse с ETag и Last-Modified; на условный запрос - 304.
+
+    WSGI-сервер с wsgi.file_wrapper (gunicorn, uWSGI) отправляет
+    FileResponse через sendfile, не копируя файл через Python. С
+    ranges=True обрабатывается заголовок Range.
+    """
+    stat = os.stat(path)
+    headers = HttpResponse()
+    headers['ETag'] = quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+    headers['Last-Modified'] = http_date(stat.st_mtime)
+    headers['Cache-Control'] = cache_control
+    conditional = get_conditional_response(
+        request,
+        etag=headers['ETag'],
+        last_modified=int(stat.st_mtime),
+        response=headers,
+    )
+    if conditional is not headers:
+        return conditional
+    if content_type is None:
+        content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream')
+    requested = None
+    if ranges:
+        try:
+            requested = byte_range(
+                request, stat.st_size, headers['ETag'],
+                headers['Last-Modified'],
+            )
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+    if requested is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    else:
+        response = range_response(
+            path, content_type, *requested, stat.st_size)
+    # FileResponse угадывает тип text/html по имени файла (index.html.gz).
+    response['Content-Type'] = content_type
+    for header in ('ETag', 'Last-Modified', 'Cache-Control'):
+        response[header] = headers[header]
+    if ranges:
+        response['Accept-Ranges'] = 'bytes'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
+
+
+def serve_static(request, root, path, immutable=False, content_type=None):
+    """Отдаёт файл статики, выбирая сжатую копию по Accept-Encoding."""
+    fullpath = resolve(root, path)
+    if content_type is None:
+        content_type = (
+            mimetypes.guess_type(fullpath)[0] or 'application/octet-stream')
+    cache_control = IMMUTABLE if immutable else REVALIDATE
+    accepted = accepted_encodings(request)
+    response = None
+    for encoding, suffix in COMPRESSED_VARIANTS:
+        if encoding in accepted and os.path.isfile(fullpath + suffix):
+            response = file_response(
+                request, fullpath + suffix, content_type, encoding,
+                cache_control,
+            )
+            break
+    if response is None:
+        response = file_response(
+            request, fullpath, content_type, cache_control=cache_control)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
@@ -0,0 +1,249 @@
+"""Генератор нагрузки для manage.py loadtest.
+
+Каждый поток - отдельный клиент со своими cookie, который выполняет
+сценарии из смеси (лента, пост, вход, комментарий). Запросы идут либо
+в WSGI-приложение в том же процессе, либо по HTTP на запущенный сервер.
+"""
+import http.client
+import io
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+import django
+from django.conf import settings
+from django.urls import reverse
+
+
+class WSGITransport:
+    """Вызывает WSGI-приложение напрямую, без сети и HTTP-сервера."""
+
+    def __init__(self, application, host):
+        self.application = application
+        self.host = host
+
+    def environ(self, method, path, body, headers):
+        path, _, query = path.partition('?')
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SERVER_NAME': self.host,
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': self.host,
+            'REMOTE_ADDR': '127.0.0.1',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': io.StringIO(),
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in headers.items():
+            key = name.upper().replace('-', '_')
+            if key != 'CONTENT_TYPE':
+                key = f'HTTP_{key}'
+            environ[key] = value
+        return environ
+
+    def request(self, method, path, body, headers):
+        started = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            started['status'] = int(status.split()[0])
+            started['headers'] = response_headers
+            return lambda data: None
+
+        result = self.application(
+            self.environ(method, path, body, headers), start_response)
+        try:
+            content = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return started['status'], started['headers'], content
+
+
+class HTTPTransport:
+    """Запросы к запущенному серверу через keep-alive соединение."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.connection_class = (
+            http.client.HTTPSConnection if parts.scheme == 'https'
+            else http.client.HTTPConnection
+        )
+        self.address = (parts.hostname, parts.port)
+        self.prefix = parts.path.rstrip('/')
+        self.connection = None
+
+    def request(self, method, path, body, headers):
+        if self.connection is None:
+            self.connection = self.connection_class(
+                *self.address, timeout=30)
+        try:
+            self.connection.request(
+                method, self.prefix + path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            return response.status, response.getheaders(), response.read()
+        except (http.client.HTTPException, OSError):
+            self.connection.close()
+            self.connection = None
+            raise
+
+
+class Session:
+    """Клиент с cookie и CSRF-токеном, как у браузера."""
+
+    def __init__(self, transport):
+        self.transport = transport
+        self.cookies = {}
+
+    def request(self, method, path, data=None, headers=None):
+        headers = dict(headers or {})
+        body = b''
+        if self.cookies:
+            headers['Cookie'] = '; '.join(
+                f'{name}={value}' for name, value in self.cookies.items())
+        if data is not None:
+            body = urlencode(data).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+            headers['X-CSRFToken'] = self.cookies.get('csrftoken', '')
+        status, response_headers, _ = self.transport.request(
+            method, path, body, headers)
+        for name, value in response_headers:
+            if name.lower() == 'set-cookie':
+                self.update_cookies(value)
+        return status
+
+    def update_cookies(self, header):
+        for morsel in SimpleCookie(header).values():
+            if morsel.value:
+                self.cookies[morsel.key] = morsel.value
+            else:
+                self.cookies.pop(morsel.key, None)
+
+    def login(self, username, password):
+        self.cookies.clear()
+        path = reverse('users:login')
+        self.request('GET', path)
+        return self.request('POST', path, {
+            'username': username,
+            'password': password,
+            'csrfmiddlewaretoken': self.cookies.get('csrftoken', ''),
+        })
+
+
+# Сценарии: (session, sample, rng) -> успешен ли последний ответ или
+# LIMITED, если его отклонил core.ratelimit.
+
+LIMITED = 'limited'
+
+
+def outcome(status, ok):
+    return LIMITED if status == 429 else ok
+
+
+def feed(session, sample, rng):
+    status = session.request('GET', rng.choice(sample['feeds']))
+    return outcome(status, status < 400)
+
+
+def detail(session, sample, rng):
+    post_id = rng.choice(sample['posts'])
+    status = session.request('GET', f'/posts/{post_id}/')
+    return outcome(status, status < 400)
+
+
+def login(session, sample, rng):
+    status = session.login(rng.choice(sample['users']), sample['password'])
+    # Успешный вход перенаправляет на LOGIN_REDIRECT_URL.
+    return outcome(status, status == 302)
+
+
+def write(session, sample, rng):
+    if 'sessionid' not in session.cookies:
+        login(session, sample, rng)
+    post_id = rng.choice(sample['posts'])
+    status = session.request(
+        'POST', f'/posts/{post_id}/comment/',
+        {'text': 'Комментарий нагрузочного теста'},
+        {'X-Requested-With': 'XMLHttpRequest'},
+    )
+    return outcome(status, status == 201)
+
+
+SCENARIOS = {
+    'feed': feed,
+    'detail': detail,
+    'login': login,
+    'write': write,
+}
+
+
+def parse_mix(value):
+    """'feed=60,detail=30,write=10' -> [('feed', 60), ...]."""
+    mix = []
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f'Неизвестный сценарий {name}')
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+def make_transport(config):
+    if config['url']:
+        return HTTPTransport(config['url'])
+    from yatube.wsgi import application
+
+    return WSGITransport(application, config['host'])
+
+
+def setup_process(overrides):
+    """initializer процессов команды loadtest."""
+    django.setup()
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+
+def worker(config, count, seed):
+    """Выполняет count сценариев после разогрева.
+
+    Возвращает [(сценарий, начало, секунды, ok)], где ok - True, False
+    или LIMITED; начало - по time.monotonic(), общему для процессов,
+    чтобы считать общее время.
+    """
+    rng = random.Random(seed)
+    session = Session(make_transport(config))
+    names = [name for name, _ in config['mix']]
+    weights = [weight for _, weight in config['mix']]
+    results = []
+    for number in range(config['warmup'] + count):
+        name = rng.choices(names, weights)[0]
+        start = time.monotonic()
+        try:
+            ok = SCENARIOS[name](session, config['sample'], rng)
+        except Exception:
+            ok = False
+        if number >= config['warmup']:
+            results.append((name, start, time.monotonic() - start, ok))
+    return results
+
+
+def run_threads(config, count, threads, seed=0):
+    """count сценариев, поделённых между threads потоками."""
+    shares = [
+        count // threads + (i < count % threads) for i in range(threads)]
+    with ThreadPoolExecutor(threads) as pool:
+        futures = [
+            pool.submit(worker, config, share, seed * 1000 + i)
+            for i, share in enumerate(shares)
+        ]
+        return [row for future in futures for row in future.result()]
@@ -0,0 +1,73 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+
+from core.utils import percentile
+
+User = get_user_model()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        'Последовательно запрашивает страницы через весь стек middleware '
+        'и выводит пропускную способность и задержки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument(
+            '--user', default=None,
+            help='Выполнять запросы от имени пользователя с этим username',
+        )
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        if options['user']:
+            try:
+                client.force_login(User.objects.get(username=options['user']))
+            except User.DoesNotExist:
+                raise CommandError(f"Пользователь {options['user']} не найден")
+
+        self.stdout.write(
+            f'{"url":40} {"req/s":>9} {"mean ms":>9} '
+            f'{"p95 ms":>9} {"max ms":>9} {"queries":>8}'
+        )
+        for url in options['urls']:
+            for _ in range(options['warmup']):
+                client.get(url)
+            durations = []
+            counter = QueryCounter()
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(counter))
+                for _ in range(options['requests']):
+                    start = time.perf_counter()
+                    response = client.get(url)
+                    durations.append(time.perf_counter() - start)
+                    if response.status_code >= 400:
+                        raise CommandError(
+                            f'{url} вернул статус {response.status_code}')
+            total = sum(durations)
+            self.stdout.write(
+                f'{url:40} {len(durations) / total:9.1f} '
+                f'{total / len(durations) * 1000:9.2f} '
+                f'{percentile(durations, 0.95) * 1000:9.2f} '
+                f'{max(durations) * 1000:9.2f} '
+                f'{counter.count / len(durations):8.1f}'
+            )
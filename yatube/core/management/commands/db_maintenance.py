@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class Command(BaseCommand):
+    help = (
+        'Обслуживание SQLite: ANALYZE, PRAGMA optimize, '
+        'инкрементальный VACUUM и сброс WAL'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--vacuum-pages', type=int, default=0,
+            help='Сколько свободных страниц вернуть (0 - все)',
+        )
+        parser.add_argument(
+            '--enable-incremental-vacuum', action='store_true',
+            help='Включить auto_vacuum=INCREMENTAL (выполняет полный VACUUM)',
+        )
+
+    def pragma(self, cursor, statement):
+        cursor.execute(f'PRAGMA {statement}')
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда предназначена только для SQLite')
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            self.stdout.write('ANALYZE: статистика планировщика обновлена')
+            self.pragma(cursor, 'optimize')
+            self.stdout.write('PRAGMA optimize выполнена')
+
+            if options['enable_incremental_vacuum']:
+                self.pragma(cursor, 'auto_vacuum = INCREMENTAL')
+                cursor.execute('VACUUM')
+                self.stdout.write('auto_vacuum=INCREMENTAL включён')
+
+            freelist = self.pragma(cursor, 'freelist_count')
+            auto_vacuum = self.pragma(cursor, 'auto_vacuum')
+            if auto_vacuum == AUTO_VACUUM_INCREMENTAL:
+                statement = 'PRAGMA incremental_vacuum'
+                if options['vacuum_pages']:
+                    statement += f"({options['vacuum_pages']})"
+                cursor.execute(statement)
+                cursor.fetchall()
+                self.stdout.write(
+                    f'Инкрементальный VACUUM: свободных страниц было '
+                    f'{freelist}, осталось '
+                    f'{self.pragma(cursor, "freelist_count")}'
+                )
+            else:
+                self.stdout.write(
+                    f'Свободных страниц: {freelist}; инкрементальный VACUUM '
+                    f'выключен (см. --enable-incremental-vacuum)'
+                )
+
+            if self.pragma(cursor, 'journal_mode') == 'wal':
+                self.pragma(cursor, 'wal_checkpoint(TRUNCATE)')
+                self.stdout.write('WAL сброшен в основной файл')
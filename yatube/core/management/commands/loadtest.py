@@ -0,0 +1,164 @@
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.loadtest import LIMITED, parse_mix, run_threads, setup_process
+from core.utils import percentile
+from posts.models import Group, Post
+from posts.sharding import sharding_enabled
+
+User = get_user_model()
+
+DEFAULT_MIX = 'feed=60,detail=30,login=2,write=8'
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест: смесь сценариев (лента, пост, вход, '
+        'комментарий) в N потоках и процессах против WSGI-приложения в '
+        'этом процессе или запущенного сервера'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default=None,
+            help='Адрес запущенного сервера, например http://127.0.0.1:8000;'
+                 ' по умолчанию yatube.wsgi.application в этом процессе',
+        )
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument(
+            '--processes', type=int, default=1,
+            help='Процессы, в каждом --threads потоков',
+        )
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--mix', default=DEFAULT_MIX,
+            help=f'Веса сценариев, по умолчанию {DEFAULT_MIX}',
+        )
+        parser.add_argument(
+            '--users', default='',
+            help='Пользователи для входа через запятую (по умолчанию - '
+                 'все активные)',
+        )
+        parser.add_argument(
+            '--password', default=None,
+            help='Пароль пользователей для сценариев login и write',
+        )
+        parser.add_argument(
+            '--ratelimit', action='store_true',
+            help='Не выключать core.ratelimit в этом процессе: иначе '
+                 'сценарий write упирается в лимит комментариев',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options['mix'])
+        except ValueError as error:
+            raise CommandError(error)
+        names = {name for name, _ in mix}
+        if names & {'login', 'write'} and not options['password']:
+            raise CommandError('Для сценариев login и write нужен --password')
+        config = {
+            'url': options['url'],
+            'host': settings.ALLOWED_HOSTS[0],
+            'mix': mix,
+            'warmup': options['warmup'],
+            'sample': self.sample(options),
+        }
+        # С --url лимиты задаёт сервер; ответы 429 считаются отдельно.
+        overrides = {}
+        if not options['ratelimit'] and not options['url']:
+            overrides['RATELIMIT_ENABLED'] = False
+        with override_settings(**overrides):
+            results = self.run(config, options, overrides)
+        self.report(results)
+
+    def sample(self, options):
+        """Адреса лент, id постов и пользователи для сценариев."""
+        aliases = settings.POST_SHARDS if sharding_enabled() else [None]
+        posts = []
+        for alias in aliases:
+            posts += Post.objects.using(alias).order_by('?').values_list(
+                'pk', flat=True)[:500]
+        if not posts:
+            raise CommandError('В базе нет постов')
+        users = [name for name in options['users'].split(',') if name]
+        if not users:
+            users = list(User.objects.filter(is_active=True).values_list(
+                'username', flat=True)[:100])
+        feeds = [reverse('posts:index'), reverse('posts:trending')]
+        feeds += [f'{reverse("posts:index")}?page={n}' for n in range(2, 6)]
+        feeds += [
+            reverse('posts:postsname', kwargs={'slug': slug})
+            for slug in Group.objects.values_list('slug', flat=True)[:20]
+        ]
+        feeds += [
+            reverse('posts:profile', kwargs={'username': name})
+            for name in users[:20]
+        ]
+        return {
+            'posts': posts,
+            'users': users,
+            'feeds': feeds,
+            'password': options['password'],
+        }
+
+    def run(self, config, options, overrides):
+        threads, processes = options['threads'], options['processes']
+        if processes == 1:
+            return run_threads(config, options['requests'], threads)
+        # Соединения с базой не должны достаться дочерним процессам.
+        connections.close_all()
+        shares = [
+            options['requests'] // processes
+            + (i < options['requests'] % processes)
+            for i in range(processes)
+        ]
+        with ProcessPoolExecutor(
+            processes, initializer=setup_process, initargs=(overrides,),
+        ) as pool:
+            futures = [
+                pool.submit(run_threads, config, share, threads, i + 1)
+                for i, share in enumerate(shares)
+            ]
+            return [row for future in futures for row in future.result()]
+
+    def report(self, results):
+        if not results:
+            raise CommandError('Нет результатов')
+        wall = (
+            max(start + duration for _, start, duration, _ in results)
+            - min(start for _, start, _, _ in results)
+        )
+        by_name = defaultdict(list)
+        for name, _, duration, ok in sorted(results):
+            by_name[name].append((duration, ok))
+        by_name['total'] = [row for rows in by_name.values() for row in rows]
+        self.stdout.write(
+            f'{"scenario":10} {"count":>7} {"errors":>7} {"429":>7} '
+            f'{"mean ms":>9} '
+            f'{"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"max ms":>9}'
+        )
+        for name, rows in by_name.items():
+            durations = [duration * 1000 for duration, _ in rows]
+            errors = sum(ok is False for _, ok in rows) / len(rows)
+            limited = sum(ok == LIMITED for _, ok in rows) / len(rows)
+            self.stdout.write(
+                f'{name:10} {len(rows):7} {errors:7.1%} {limited:7.1%} '
+                f'{sum(durations) / len(durations):9.2f} '
+                f'{percentile(durations, 0.5):9.2f} '
+                f'{percentile(durations, 0.95):9.2f} '
+                f'{percentile(durations, 0.99):9.2f} '
+                f'{max(durations):9.2f}'
+            )
+        self.stdout.write(
+            f'Сценариев в секунду: {len(results) / wall:.1f} '
+            f'({len(results)} за {wall:.2f} с)'
+        )
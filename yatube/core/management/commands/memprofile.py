@@ -0,0 +1,76 @@
+import shlex
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from core.memprofile import Profile, format_stats
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает, где растёт память при повторных запросах страницы '
+        'или при выполнении команды (tracemalloc)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', nargs='?')
+        parser.add_argument(
+            '--command', default=None,
+            help='Профилировать команду, например "rebuild_post_counts"',
+        )
+        parser.add_argument('--requests', type=int, default=20)
+        parser.add_argument(
+            '--warmup', type=int, default=3,
+            help='Запросы до базового снимка: кэши и ленивые импорты',
+        )
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument(
+            '--group-by', choices=('lineno', 'filename', 'traceback'),
+            default='lineno',
+        )
+        parser.add_argument(
+            '--user', default=None,
+            help='Выполнять запросы от имени пользователя с этим username',
+        )
+
+    def handle(self, *args, **options):
+        if bool(options['url']) == bool(options['command']):
+            raise CommandError('Укажите адрес страницы или --command')
+        profile = Profile(options['limit'], options['group_by'])
+        if options['command']:
+            name, *arguments = shlex.split(options['command'])
+            with profile:
+                call_command(name, *arguments, stdout=self.stdout)
+        else:
+            self.profile_url(profile, options)
+        self.stdout.write(
+            f'{"рост":>14} {"блоков":>8} {"всего":>14}  место')
+        for line in format_stats(profile.stats):
+            self.stdout.write(line)
+
+    def profile_url(self, profile, options):
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        if options['user']:
+            try:
+                client.force_login(User.objects.get(username=options['user']))
+            except User.DoesNotExist:
+                raise CommandError(f"Пользователь {options['user']} не найден")
+        for _ in range(options['warmup']):
+            client.get(options['url'])
+        # Память, оставшаяся после N запросов, - кандидат на утечку.
+        with profile:
+            for _ in range(options['requests']):
+                response = client.get(options['url'])
+                if response.status_code >= 400:
+                    raise CommandError(
+                        f"{options['url']} вернул статус "
+                        f'{response.status_code}')
+        self.stdout.write(
+            f"{options['url']}: {options['requests']} запросов, "
+            f'{profile.seconds:.2f} с'
+        )
@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+DB_ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет истёкшие сессии из базы пачками, не блокируя SQLite '
+        'надолго (в отличие от clearsessions)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--sleep', type=float, default=0.1,
+            help='Пауза между пачками, чтобы пропустить запросы на запись',
+        )
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE not in DB_ENGINES:
+            self.stdout.write(
+                f'{settings.SESSION_ENGINE} не хранит сессии в базе')
+            return
+        now = timezone.now()
+        total = 0
+        while True:
+            keys = list(
+                Session.objects.filter(expire_date__lt=now)
+                .values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not keys:
+                break
+            total += Session.objects.filter(pk__in=keys).delete()[0]
+            time.sleep(options['sleep'])
+        self.stdout.write(f'Удалено истёкших сессий: {total}')
@@ -0,0 +1,52 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплики из DATABASE_REPLICAS '
+        'через backup API'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять копирование каждые N секунд',
+        )
+        parser.add_argument(
+            '--pages', type=int, default=1024,
+            help='Страниц за шаг копирования; между шагами пишущие '
+                 'запросы к основной базе не блокируются',
+        )
+
+    def refresh(self, source_name, replica_alias, pages):
+        replica_name = settings.DATABASES[replica_alias]['NAME']
+        start = time.perf_counter()
+        source = sqlite3.connect(source_name)
+        replica = sqlite3.connect(replica_name)
+        try:
+            source.backup(replica, pages=pages)
+        finally:
+            replica.close()
+            source.close()
+        self.stdout.write(
+            f'{replica_alias}: {replica_name} обновлена за '
+            f'{time.perf_counter() - start:.2f} с'
+        )
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES[DEFAULT_DB_ALIAS]
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('Команда предназначена только для SQLite')
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Реплики не настроены (DATABASE_REPLICAS)')
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                self.refresh(primary['NAME'], alias, options['pages'])
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
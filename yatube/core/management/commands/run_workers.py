@@ -0,0 +1,90 @@
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from core import tasks
+
+
+def work(worker, poll, stop, once=False):
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            job = tasks.claim(worker)
+            if job is None:
+                if once:
+                    return
+                stop.wait(poll)
+                continue
+            tasks.run(job)
+    finally:
+        connections.close_all()
+
+
+def run_threads(name, threads, poll, once):
+    tasks.discover()
+    stop = threading.Event()
+    pool = [
+        threading.Thread(
+            target=work,
+            args=(f'{name}-{index}', poll, stop, once),
+            daemon=True,
+        )
+        for index in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    try:
+        for thread in pool:
+            while thread.is_alive():
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in pool:
+            thread.join()
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркеры фоновых задач (core.tasks)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--processes', type=int, default=1)
+        parser.add_argument(
+            '--poll', type=float, default=1.0,
+            help='Пауза между опросами пустой очереди, с',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться',
+        )
+
+    def handle(self, *args, **options):
+        tasks.discover()
+        tasks.requeue_stale(settings.TASKS_STALE_TIMEOUT)
+        name = f'{socket.gethostname()}-{os.getpid()}'
+        worker_args = (options['threads'], options['poll'], options['once'])
+        if options['processes'] == 1:
+            run_threads(name, *worker_args)
+            return
+        # Соединения с БД нельзя разделять между процессами.
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(
+                target=run_threads, args=(f'{name}-{index}', *worker_args))
+            for index in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+            time.sleep(0.1)
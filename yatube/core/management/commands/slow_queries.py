@@ -0,0 +1,102 @@
+import glob
+import json
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils import percentile
+
+SORT_KEYS = ('total', 'avg', 'max', 'count')
+
+
+class Command(BaseCommand):
+    help = 'Сводка по журналу медленных SQL-запросов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--sort', choices=SORT_KEYS, default='total')
+        parser.add_argument(
+            '--since', type=float, default=None,
+            help='Учитывать только записи за последние N часов',
+        )
+        parser.add_argument(
+            '--slow-only', action='store_true',
+            help='Не учитывать записи из случайной выборки',
+        )
+        parser.add_argument('--log-file', default=None)
+
+    def read_entries(self, log_file):
+        # Ротированные файлы (.1, .2, ...) читаем вместе с текущим.
+        for path in sorted(glob.glob(f'{log_file}*')):
+            with open(path, encoding='utf-8') as log:
+                for line in log:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def aggregate(self, entries):
+        stats = defaultdict(lambda: {
+            'durations': [],
+            'slow': 0,
+            'url_names': Counter(),
+            'call_sites': Counter(),
+            'templates': Counter(),
+        })
+        for entry in entries:
+            item = stats[entry['fingerprint']]
+            item['durations'].append(entry['duration_ms'])
+            item['slow'] += entry['slow']
+            item['url_names'][entry['url_name']] += 1
+            item['call_sites'][entry['call_site']] += 1
+            if entry['template']:
+                item['templates'][entry['template']] += 1
+
+        rows = []
+        for sql, item in stats.items():
+            durations = item['durations']
+            rows.append({
+                'sql': sql,
+                'count': len(durations),
+                'slow': item['slow'],
+                'total': sum(durations),
+                'avg': sum(durations) / len(durations),
+                'p95': percentile(durations, 0.95),
+                'max': max(durations),
+                'item': item,
+            })
+        return rows
+
+    def handle(self, *args, **options):
+        log_file = options['log_file'] or settings.SLOW_QUERY_LOG_FILE
+        if not glob.glob(f'{log_file}*'):
+            raise CommandError(f'Журнал {log_file} не найден')
+        since = 0
+        if options['since'] is not None:
+            since = time.time() - options['since'] * 3600
+        entries = (
+            entry for entry in self.read_entries(log_file)
+            if entry['time'] >= since
+            and (entry['slow'] or not options['slow_only'])
+        )
+        rows = self.aggregate(entries)
+        rows.sort(key=lambda row: row[options['sort']], reverse=True)
+
+        for row in rows[:options['limit']]:
+            item = row['item']
+            self.stdout.write(
+                f"{row['total']:10.1f} ms total  {row['count']:6} calls  "
+                f"{row['slow']:6} slow  avg {row['avg']:.1f}  "
+                f"p95 {row['p95']:.1f}  max {row['max']:.1f}"
+            )
+            self.stdout.write(f"    {row['sql'][:300]}")
+            for title, counter in (
+                ('url', item['url_names']),
+                ('code', item['call_sites']),
+                ('template', item['templates']),
+            ):
+                for name, count in counter.most_common(3):
+                    self.stdout.write(f'    {title}: {name} ({count})')
+            self.stdout.write('')
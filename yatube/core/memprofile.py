@@ -0,0 +1,119 @@
+"""Профилирование памяти через tracemalloc.
+
+Снимки аллокаций сравниваются до и после запроса или команды, а также с
+базовым снимком процесса: рост относительно базы показывает, какие места
+в коде удерживают память воркера.
+"""
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+from django.conf import settings
+
+MEMPROFILE_FRAMES = 10
+MEMPROFILE_TOP = 20
+MEMPROFILE_KEEP = 20
+
+FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+_lock = threading.Lock()
+_baseline = None
+reports = deque(maxlen=getattr(settings, 'MEMPROFILE_KEEP', MEMPROFILE_KEEP))
+
+
+def start():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(
+            getattr(settings, 'MEMPROFILE_FRAMES', MEMPROFILE_FRAMES))
+
+
+def snapshot():
+    return tracemalloc.take_snapshot().filter_traces(FILTERS)
+
+
+def short_name(filename):
+    """Путь относительно проекта или site-packages."""
+    for marker in (f'{settings.BASE_DIR}/', 'site-packages/'):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    return filename
+
+
+def top_diff(after, before, limit=None, key_type='lineno'):
+    """Места с наибольшим ростом памяти между снимками."""
+    limit = limit or getattr(settings, 'MEMPROFILE_TOP', MEMPROFILE_TOP)
+    stats = after.compare_to(before, key_type)
+    return [
+        {
+            'site': f'{short_name(stat.traceback[0].filename)}:'
+                    f'{stat.traceback[0].lineno}',
+            'size_diff': stat.size_diff,
+            'count_diff': stat.count_diff,
+            'size': stat.size,
+        }
+        for stat in stats[:limit]
+        if stat.size_diff
+    ]
+
+
+def format_stats(stats):
+    return [
+        f'{row["size_diff"] / 1024:+10.1f} KiB {row["count_diff"]:+8} '
+        f'{row["size"] / 1024:10.1f} KiB  {row["site"]}'
+        for row in stats
+    ]
+
+
+class Profile:
+    """Рост памяти внутри блока with.
+
+    tracemalloc считает аллокации всего процесса, поэтому в разницу
+    попадают и параллельные запросы других потоков.
+    """
+
+    def __init__(self, limit=None, key_type='lineno'):
+        self.limit = limit
+        self.key_type = key_type
+        self.stats = []
+
+    def __enter__(self):
+        start()
+        self.before = snapshot()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds = time.perf_counter() - self.started
+        self.stats = top_diff(
+            snapshot(), self.before, self.limit, self.key_type)
+        del self.before
+
+
+def set_baseline():
+    global _baseline
+    start()
+    with _lock:
+        _baseline = snapshot()
+
+
+def baseline_diff(limit=None):
+    """Рост памяти процесса с базового снимка; первый вызов его создаёт."""
+    if _baseline is None:
+        set_baseline()
+    return top_diff(snapshot(), _baseline, limit)
+
+
+def record(request, profile):
+    reports.append({
+        'time': time.time(),
+        'method': request.method,
+        'path': request.get_full_path(),
+        'seconds': profile.seconds,
+        'stats': profile.stats,
+    })
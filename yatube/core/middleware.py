@@ -0,0 +1,228 @@
+import hashlib
+import logging
+import random
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404
+from django.utils.cache import patch_vary_headers
+
+from .compression import (COMPRESSIBLE_TYPES, SUPPORTED_ENCODINGS,
+                          compress_body, compress_stream)
+from . import memprofile
+from .files import accepted_encodings, serve_static, snapshot_file
+from .routers import pin_to_primary
+from .slow_queries import SlowQueryLogger
+
+memprofile_logger = logging.getLogger('yatube.memprofile')
+
+
+class SlowQueryLogMiddleware:
+    """Подключает журнал медленных запросов ко всем базам на время запроса."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_logger = SlowQueryLogger(request)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(query_logger))
+            return self.get_response(request)
+
+
+class ReplicaPinningMiddleware:
+    """Закрепляет чтения за основной базой во время записи и на
+    REPLICA_PIN_SECONDS после неё (через cookie), пока реплика отстаёт."""
+
+    safe_methods = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writing = request.method not in self.safe_methods
+        pin_to_primary(
+            writing or settings.REPLICA_PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            pin_to_primary(False)
+        if writing:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+            )
+        return response
+
+
+class StaticFilesMiddleware:
+    """Раздаёт STATIC_ROOT без фронт-сервера (SERVE_STATIC = True).
+
+    Файлы с хэшем в имени кэшируются браузером навсегда, остальные
+    перепроверяются по ETag. Стоит до сессий: статике они не нужны.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SERVE_STATIC:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.hashed = set(
+            getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+    def __call__(self, request):
+        if (
+            request.method in ('GET', 'HEAD')
+            and request.path.startswith(self.prefix)
+        ):
+            path = request.path[len(self.prefix):]
+            return serve_static(
+                request, settings.STATIC_ROOT, path,
+                immutable=path in self.hashed,
+            )
+        return self.get_response(request)
+
+
+class CompressionMiddleware:
+    """Сжимает текстовые ответы brotli или gzip по Accept-Encoding.
+
+    Потоковые ответы сжимаются по частям. Сжатое тело кэшируемого ответа
+    (с max-age, как у cache_page) сохраняется в кэше по хэшу содержимого,
+    и попадание в cache_page не сжимается заново. Защита от BREACH:
+    CSRF-токен маскируется заново в каждом ответе.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.negotiate(request)
+        if encoding is None:
+            return response
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            body = self.compressed_body(response, encoding)
+            if body is None:
+                return response
+            response.content = body
+            response['Content-Length'] = str(len(body))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    def compressible(self, response):
+        if response.has_header('Content-Encoding'):
+            return False
+        # Файлы и их части отдаются через sendfile, сжимать их на лету
+        # дороже, чем отдать как есть (у статики есть сжатые копии).
+        if getattr(response, 'file_to_stream', None) is not None:
+            return False
+        if not response.get('Content-Type', '').startswith(
+                COMPRESSIBLE_TYPES):
+            return False
+        return (
+            response.streaming
+            or len(response.content) >= settings.COMPRESSION_MIN_SIZE
+        )
+
+    def negotiate(self, request):
+        accepted = accepted_encodings(request)
+        for encoding in SUPPORTED_ENCODINGS:
+            if encoding in accepted:
+                return encoding
+        return None
+
+    def compressed_body(self, response, encoding):
+        """Сжатое тело или None, если сжатие не уменьшает размер."""
+        key = None
+        if 'max-age' in response.get('Cache-Control', ''):
+            digest = hashlib.md5(response.content).hexdigest()
+            key = f'compressed:{encoding}:{digest}'
+            body = cache.get(key)
+            if body is not None:
+                return body
+        body = compress_body(response.content, encoding)
+        if len(body) >= len(response.content):
+            return None
+        if key is not None:
+            cache.set(key, body, settings.COMPRESSION_CACHE_TIMEOUT)
+        return body
+
+
+class SnapshotMiddleware:
+    """Отдаёт анонимным читателям готовые HTML-снимки страниц.
+
+    Снимки из SNAPSHOT_ROOT отдаются без ORM и шаблонов. Запросы с
+    параметрами, с cookie сессии или сообщений и страницы без снимка
+    обрабатываются обычными представлениями.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SNAPSHOTS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.cookies = (settings.SESSION_COOKIE_NAME, 'messages')
+
+    def servable(self, request):
+        return (
+            request.method in ('GET', 'HEAD')
+            and not request.GET
+            and not any(name in request.COOKIES for name in self.cookies)
+        )
+
+    def __call__(self, request):
+        if self.servable(request):
+            try:
+                response = serve_static(
+                    request, settings.SNAPSHOT_ROOT,
+                    snapshot_file(request.path),
+                    content_type='text/html; charset=utf-8',
+                )
+            except Http404:
+                pass
+            else:
+                patch_vary_headers(response, ['Cookie'])
+                return response
+        return self.get_response(request)
+
+
+class MemoryProfileMiddleware:
+    """Снимает рост памяти tracemalloc для случайной выборки запросов.
+
+    Включается MEMPROFILE_ENABLED: трассировка замедляет весь процесс,
+    поэтому в production - на время расследования. Отчёты видны на
+    странице memprofile для персонала и пишутся в лог yatube.memprofile.
+    """
+
+    def __init__(self, get_response):
+        if not settings.MEMPROFILE_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        memprofile.set_baseline()
+
+    def __call__(self, request):
+        if random.random() >= settings.MEMPROFILE_SAMPLE_RATE:
+            return self.get_response(request)
+        with memprofile.Profile() as profile:
+            response = self.get_response(request)
+        memprofile.record(request, profile)
+        memprofile_logger.info(
+            '%s %s\n%s', request.method, request.get_full_path(),
+            '\n'.join(memprofile.format_stats(profile.stats)),
+        )
+        return response
@@ -0,0 +1,60 @@
+from django.db import models
+from django.db.models import Q
+
+
+class Job(models.Model):
+    """Фоновая задача очереди core.tasks."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=200)
+    payload = models.TextField('Аргументы (JSON)', default='{}')
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    idempotency_key = models.CharField(
+        'Ключ идемпотентности', max_length=200, blank=True, null=True)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField(
+        'Максимум попыток', default=5)
+    run_at = models.DateTimeField('Запустить не раньше')
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_due'),
+        ]
+        constraints = [
+            # Пока задача ждёт в очереди, повторная постановка с тем же
+            # ключом ничего не добавляет.
+            models.UniqueConstraint(
+                fields=['idempotency_key'],
+                condition=Q(status='queued'),
+                name='unique_queued_job_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} [{self.status}]'
+
+
+class RateLimitCounter(models.Model):
+    """Счётчик окна core.ratelimit для кэша без атомарного incr."""
+    key = models.CharField(max_length=255, primary_key=True)
+    count = models.PositiveIntegerField(default=0)
+    expires = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f'{self.key}: {self.count}'
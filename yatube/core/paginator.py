@@ -0,0 +1,26 @@
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+from .sqlite import estimated_count
+
+ESTIMATED_COUNT_MIN = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator для admin: COUNT(*) по большой таблице без фильтров
+    заменяется оценкой из статистики планировщика.
+
+    Оценка приблизительна: последняя страница может оказаться неполной
+    или пустой. Выборки с фильтрами и поиском считаются точно.
+    """
+
+    min_rows = ESTIMATED_COUNT_MIN
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.min_rows:
+                return estimate
+        return super().count
@@ -0,0 +1,198 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Manager, QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.db.models.expressions import Col
+from django.db.models.lookups import Exact
+from django.db.models.sql.where import AND
+
+QUERY_CACHE_TIMEOUT = 300
+
+
+def table_key(table):
+    """Версия таблицы: меняется при любой записи в неё."""
+    return f'qc.table:{table}'
+
+
+def row_key(table, pk):
+    return f'qc.row:{table}:{pk}'
+
+
+def bulk_key(table):
+    """Эпоха таблицы: меняется при update()/delete() без сигналов."""
+    return f'qc.bulk:{table}'
+
+
+def bump(*keys):
+    # Время, а не счётчик: вытесненная из кэша версия не повторится.
+    now = time.time_ns()
+    cache.set_many({key: now for key in keys}, None)
+
+
+def instance_saved(sender, instance, using=None, **kwargs):
+    table = sender._meta.db_table
+    keys = (table_key(table), row_key(table, instance.pk))
+    bump(*keys)
+    # Повторно после фиксации: выборка, прочитавшая старые данные между
+    # сигналом и COMMIT, не должна остаться в кэше с новой версией.
+    transaction.on_commit(lambda: bump(*keys), using=using)
+
+
+def track(model):
+    """Сбрасывает кэш выборок при записи в таблицу модели.
+
+    Отслеживаться должны все таблицы кэшируемых выборок, включая
+    присоединённые через select_related.
+    """
+    uid = f'core.querycache.{model._meta.label}'
+    post_save.connect(instance_saved, sender=model, dispatch_uid=uid)
+    post_delete.connect(instance_saved, sender=model, dispatch_uid=uid)
+
+
+def unique_lookup(query):
+    """Выборка из одной таблицы с условием field=value по уникальному
+    полю: найти она может только одну строку."""
+    if len(query.alias_map) != 1 or query.where.connector != AND:
+        return False
+    if query.where.negated:
+        return False
+    return any(
+        isinstance(child, Exact)
+        and isinstance(child.lhs, Col)
+        and child.lhs.target.unique
+        for child in query.where.children
+    )
+
+
+def row_dependencies(queryset, result):
+    """Найденная по уникальному полю строка зависит только от своей
+    версии: другие записи в таблицу её не меняют. Для остальных выборок
+    (и пустого результата) - None, они зависят от версий таблиц."""
+    if (
+        len(result) == 1
+        and hasattr(result[0], 'pk')
+        and unique_lookup(queryset.query)
+    ):
+        table = queryset.model._meta.db_table
+        return [row_key(table, result[0].pk), bulk_key(table)]
+    return None
+
+
+def versions(keys):
+    """Текущие версии ключей; недостающие создаются."""
+    current = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in current}
+    if missing:
+        cache.set_many(missing, None)
+        current.update(missing)
+    return current
+
+
+class CachingQuerySet(QuerySet):
+    """QuerySet с кэшем результатов: Post.objects.cached().filter(...).
+
+    Результат хранится в кэше по SQL-запросу вместе с версиями таблиц
+    или строк, от которых он зависит, и считается устаревшим, как только
+    одна из версий изменится: сигналы post_save и post_delete моделей из
+    track(), а также update() и delete() этого QuerySet.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cache_timeout = None
+
+    def cached(self, timeout=None):
+        clone = self._chain()
+        clone._cache_timeout = timeout or getattr(
+            settings, 'QUERY_CACHE_TIMEOUT', QUERY_CACHE_TIMEOUT)
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._cache_timeout = self._cache_timeout
+        return clone
+
+    def cache_alias(self):
+        """База для кэшируемой выборки.
+
+        Реплика может отставать: прочитанный сразу после записи старый
+        результат сохранился бы в кэше под новыми версиями. Поэтому
+        такие выборки читают основную базу, а ключ кэша не зависит от
+        случайно выбранной реплики.
+        """
+        alias = self.db
+        if alias in settings.DATABASE_REPLICAS:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def cache_key(self):
+        sql, params = self.query.get_compiler(using=self.db).as_sql()
+        raw = f'{self.db}:{self._iterable_class.__name__}:{sql}:{params!r}'
+        return 'qc:' + hashlib.md5(raw.encode()).hexdigest()
+
+    def _fetch_all(self):
+        if self._result_cache is None and self._cache_timeout is not None:
+            self._result_cache = self.fetch_cached()
+        super()._fetch_all()
+
+    def fetch_cached(self):
+        self._db = self.cache_alias()
+        try:
+            key = self.cache_key()
+        except EmptyResultSet:
+            return []
+        entry = cache.get(key)
+        if entry is not None:
+            result, deps = entry
+            if cache.get_many(list(deps)) == deps:
+                return result
+        tables = [
+            table_key(join.table_name)
+            for join in self.query.alias_map.values()
+        ]
+        before = versions(tables)
+        result = list(self._iterable_class(self))
+        rows = row_dependencies(self, result)
+        deps = versions(rows) if rows else before
+        # Запись во время запроса: результат мог устареть, не кэшируем.
+        if cache.get_many(tables) == before:
+            cache.set(key, (result, deps), self._cache_timeout)
+        return result
+
+    def bump_tables(self):
+        table = self.model._meta.db_table
+        bump(table_key(table), bulk_key(table))
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        self.bump_tables()
+        return rows
+
+    update.alters_data = True
+
+    def delete(self):
+        deleted = super().delete()
+        self.bump_tables()
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+CachingManager = Manager.from_queryset(CachingQuerySet)
+
+
+def cached(queryset, timeout=None):
+    """Кэширует выборку модели без CachingManager, например User."""
+    clone = CachingQuerySet(
+        model=queryset.model,
+        query=queryset.query.chain(),
+        using=queryset._db,
+        hints=queryset._hints,
+    )
+    return clone.cached(timeout)
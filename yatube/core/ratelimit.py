@@ -0,0 +1,129 @@
+import math
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpResponse
+from django.utils import timezone
+
+from .models import RateLimitCounter
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Кэши с атомарным incr. FileBasedCache и DatabaseCache делают get и set
+# отдельно: параллельные запросы теряют приращения, поэтому с ними
+# счётчики хранятся в базе (RateLimitCounter).
+# LocMemCache атомарен только внутри процесса (разработка).
+ATOMIC_BACKENDS = (
+    'django.core.cache.backends.memcached.MemcachedCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django_redis.cache.RedisCache',
+)
+
+
+def backend_path():
+    backend = type(caches[DEFAULT_CACHE_ALIAS])
+    return f'{backend.__module__}.{backend.__qualname__}'
+
+
+def enabled():
+    return getattr(settings, 'RATELIMIT_ENABLED', True)
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60)."""
+    count, _, period = rate.partition('/')
+    return int(count), PERIODS[period]
+
+
+def user_or_ip(request):
+    """Пользователь, а для анонимов - адрес клиента.
+
+    За прокси REMOTE_ADDR должен выставлять WSGI-сервер (например,
+    forwarded_allow_ips в gunicorn), а не заголовок от клиента.
+    """
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f'ip:{request.META.get("REMOTE_ADDR", "")}'
+
+
+def hit(key, period):
+    """Увеличивает счётчик текущего окна; возвращает его значение."""
+    if backend_path() in ATOMIC_BACKENDS:
+        return cache_hit(key, period)
+    return db_hit(key, period)
+
+
+def cache_hit(key, period):
+    """Обычно один incr. Первый запрос окна создаёт счётчик через add,
+    гонку двух первых запросов решает повторный incr.
+    """
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, period + 1):
+            return 1
+        return cache.incr(key)
+
+
+def db_hit(key, period):
+    """Счётчик в базе: UPDATE count = count + 1 атомарен в любой СУБД.
+
+    Первый запрос окна создаёт строку и заодно удаляет истёкшие окна.
+    """
+    counters = RateLimitCounter.objects.filter(key=key)
+    with transaction.atomic():
+        if not counters.update(count=F('count') + 1):
+            now = timezone.now()
+            RateLimitCounter.objects.filter(expires__lt=now).delete()
+            _, created = RateLimitCounter.objects.get_or_create(
+                key=key, defaults={
+                    'count': 1,
+                    'expires': now + timedelta(seconds=period + 1),
+                })
+            if created:
+                return 1
+            counters.update(count=F('count') + 1)
+        return counters.values_list('count', flat=True).get()
+
+
+def ratelimit(rate, key=user_or_ip, methods=('POST',)):
+    """Не больше rate запросов к представлению, например '10/m'.
+
+    Запросы считаются в окнах фиксированной длины отдельно для каждого
+    ключа key(request); сверх лимита - ответ 429 с Retry-After. На стыке
+    окон проходит до 2 * rate запросов подряд. Token bucket этого не
+    допускает, но хранит два значения (токены и время) и требует
+    атомарного чтения-изменения-записи, которого у memcached нет, а
+    окно обходится одним incr.
+    """
+    limit, period = parse_rate(rate)
+
+    def decorator(view):
+        scope = f'{view.__module__}.{view.__name__}'
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not enabled() or request.method not in methods:
+                return view(request, *args, **kwargs)
+            now = time.time()
+            window = int(now // period)
+            count = hit(
+                f'ratelimit:{scope}:{key(request)}:{window}', period)
+            if count > limit:
+                response = HttpResponse(
+                    'Слишком много запросов, попробуйте позже',
+                    status=429,
+                    content_type='text/plain; charset=utf-8',
+                )
+                response['Retry-After'] = math.ceil(
+                    (window + 1) * period - now)
+                return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,56 @@
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_state = threading.local()
+
+
+def pin_to_primary(pinned=True):
+    """Направляет чтения текущего потока в основную базу."""
+    _state.pinned = pinned
+
+
+def is_pinned():
+    return getattr(_state, 'pinned', False)
+
+
+class ReplicaRouter:
+    """Чтения приложений из REPLICA_ROUTED_APPS идут в реплики, записи в
+    основную базу.
+
+    Пока поток закреплён за основной базой (см. ReplicaPinningMiddleware),
+    чтения тоже идут в основную базу: пользователь сразу видит свои записи.
+    """
+
+    def replicas(self):
+        return settings.DATABASE_REPLICAS
+
+    def db_for_read(self, model, **hints):
+        replicas = self.replicas()
+        if (
+            not replicas
+            or is_pinned()
+            or model._meta.app_label not in settings.REPLICA_ROUTED_APPS
+        ):
+            return None
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # Объект, прочитанный из реплики, сохраняется в основную базу.
+        if model._meta.app_label in settings.REPLICA_ROUTED_APPS:
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *self.replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными при копировании.
+        if db in self.replicas():
+            return False
+        return None
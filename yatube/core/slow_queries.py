@@ -0,0 +1,105 @@
+import json
+import logging
+import random
+import re
+import sys
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger('yatube.slow_queries')
+
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_SAMPLE_RATE = 0.01
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|\?')
+_IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+# Обёртки над ORM: интересно место, откуда их вызвали.
+_WRAPPER_MODULES = ('core/slow_queries.py', 'core/querycache.py')
+
+
+def fingerprint(sql):
+    """Нормализует SQL: литералы и списки IN заменяются на плейсхолдеры."""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _PLACEHOLDER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('(...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+def _python_call_site(frame):
+    """Ближайший к запросу кадр из кода проекта (не Django и не пакеты)."""
+    base_dir = settings.BASE_DIR
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        relative = filename[len(base_dir) + 1:]
+        if (
+            filename.startswith(base_dir)
+            and relative not in _WRAPPER_MODULES
+            and 'site-packages' not in filename
+        ):
+            return f'{relative}:{frame.f_lineno}'
+        frame = frame.f_back
+    return None
+
+
+def _template_call_site(frame):
+    """Ближайший узел шаблона, во время рендеринга которого выполнен запрос."""
+    while frame is not None:
+        if frame.f_code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                return f'{origin.template_name}:{token.lineno}'
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryLogger:
+    """Обёртка для connection.execute_wrapper.
+
+    Пишет в лог запросы дольше порога и случайную выборку остальных.
+    """
+
+    def __init__(self, request=None):
+        self.request = request
+        self.threshold = getattr(
+            settings, 'SLOW_QUERY_THRESHOLD_MS', SLOW_QUERY_THRESHOLD_MS)
+        self.sample_rate = getattr(
+            settings, 'SLOW_QUERY_SAMPLE_RATE', SLOW_QUERY_SAMPLE_RATE)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            slow = duration >= self.threshold
+            if slow or random.random() < self.sample_rate:
+                self.log(sql, duration, slow, context)
+
+    def url_name(self):
+        match = getattr(self.request, 'resolver_match', None)
+        if match is None:
+            return None
+        return match.view_name
+
+    def log(self, sql, duration, slow, context):
+        frame = sys._getframe(1)
+        entry = {
+            'time': time.time(),
+            'duration_ms': round(duration, 3),
+            'slow': slow,
+            'db': context['connection'].alias,
+            'fingerprint': fingerprint(sql),
+            'url_name': self.url_name(),
+            'path': getattr(self.request, 'path', None),
+            'call_site': _python_call_site(frame),
+            'template': _template_call_site(frame),
+        }
+        logger.info(json.dumps(entry, ensure_ascii=False))
@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+# Порядок важен: journal_mode переключаем раньше synchronous.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def apply_pragmas(sender, connection, **kwargs):
+    """Настраивает каждое новое соединение с SQLite (connection_created)."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', SQLITE_PRAGMAS)
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def estimated_count(model, using=DEFAULT_DB_ALIAS):
+    """Число строк таблицы по статистике ANALYZE (sqlite_stat1) или None.
+
+    Статистику обновляет manage.py db_maintenance; она может отставать.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return None
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s',
+                [model._meta.db_table],
+            )
+        except DatabaseError:
+            # ANALYZE ещё не выполнялся.
+            return None
+        row = cursor.fetchone()
+    return int(row[0].split()[0]) if row else None
@@ -0,0 +1,108 @@
+import os
+import threading
+from collections import defaultdict
+from io import BytesIO
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import File
+from django.core.files.storage import Storage
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+from django.utils.encoding import filepath_to_uri
+
+from .compression import compress
+
+_lock = threading.Lock()
+_files = defaultdict(dict)
+
+
+@deconstructible
+class InMemoryStorage(Storage):
+    """Хранилище медиафайлов в памяти процесса для тестов.
+
+    Файлы раскладываются по текущему MEDIA_ROOT, поэтому тесты с
+    override_settings(MEDIA_ROOT=...) не видят файлы друг друга.
+    """
+
+    def _files(self):
+        return _files[settings.MEDIA_ROOT]
+
+    def _open(self, name, mode='rb'):
+        content, _ = self._files()[name]
+        return File(BytesIO(content), name=name)
+
+    def _save(self, name, content):
+        content.seek(0)
+        data = content.read()
+        if isinstance(data, str):
+            data = data.encode()
+        with _lock:
+            self._files()[name] = (data, timezone.now())
+        return name
+
+    def delete(self, name):
+        with _lock:
+            self._files().pop(name, None)
+
+    def exists(self, name):
+        return name in self._files()
+
+    def size(self, name):
+        return len(self._files()[name][0])
+
+    def url(self, name):
+        return urljoin(settings.MEDIA_URL, filepath_to_uri(name))
+
+    def listdir(self, path):
+        prefix = f'{path.rstrip("/")}/' if path else ''
+        directories, files = set(), []
+        for name in self._files():
+            if not name.startswith(prefix):
+                continue
+            head, _, tail = name[len(prefix):].partition('/')
+            if tail:
+                directories.add(head)
+            else:
+                files.append(head)
+        return sorted(directories), sorted(files)
+
+    def get_modified_time(self, name):
+        return self._files()[name][1]
+
+    get_created_time = get_accessed_time = get_modified_time
+
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.html', '.txt', '.json', '.xml', '.map', '.ico',
+)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем содержимого в имени файла.
+
+    При collectstatic рядом с текстовыми файлами сохраняются копии .gz
+    и .br, чтобы не сжимать их на лету.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.write_compressed(name)
+
+    def write_compressed(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            data = source.read()
+        for suffix, compressed in compress(data):
+            # Копия, которая почти не меньше оригинала, не нужна.
+            if len(compressed) < len(data) * 0.95:
+                with open(path + suffix, 'wb') as target:
+                    target.write(compressed)
+            elif os.path.exists(path + suffix):
+                os.remove(path + suffix)
@@ -0,0 +1,137 @@
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Job
+
+logger = logging.getLogger('yatube.tasks')
+
+_registry = {}
+
+
+def task(max_attempts=5):
+    """Регистрирует функцию как фоновую задачу.
+
+    Аргументы задачи должны сериализоваться в JSON. Задача может быть
+    выполнена повторно после сбоя, поэтому должна быть идемпотентной.
+    """
+    def decorator(func):
+        name = f'{func.__module__}.{func.__name__}'
+        func.task_name = name
+        func.max_attempts = max_attempts
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(func, *args, key=None, delay=0, **kwargs):
+    """Ставит задачу в очередь. Возвращает Job или None в режиме
+    TASKS_EAGER, когда задача выполняется сразу."""
+    if settings.TASKS_EAGER:
+        func(*args, **kwargs)
+        return None
+    job = Job(
+        name=func.task_name,
+        payload=json.dumps({'args': args, 'kwargs': kwargs}),
+        idempotency_key=key,
+        max_attempts=func.max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+    if key is None:
+        job.save()
+        return job
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        return Job.objects.filter(
+            idempotency_key=key, status=Job.QUEUED).first()
+    return job
+
+
+def enqueue_on_commit(func, *args, **kwargs):
+    """Ставит задачу в очередь после фиксации текущей транзакции.
+
+    В режиме TASKS_EAGER задача выполняется сразу, не дожидаясь фиксации.
+    """
+    if settings.TASKS_EAGER:
+        enqueue(func, *args, **kwargs)
+    else:
+        transaction.on_commit(lambda: enqueue(func, *args, **kwargs))
+
+
+def backoff(attempts):
+    """Пауза перед повтором: экспоненциально растёт, но не больше часа."""
+    return min(settings.TASKS_RETRY_DELAY * 2 ** (attempts - 1), 3600)
+
+
+def claim(worker):
+    """Атомарно забирает одну готовую к запуску задачу из очереди."""
+    due = Job.objects.filter(
+        status=Job.QUEUED, run_at__lte=timezone.now()
+    ).order_by('run_at').values_list('pk', flat=True)
+    for pk in due[:10]:
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING,
+            locked_by=worker,
+            locked_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run(job):
+    func = _registry.get(job.name)
+    try:
+        if func is None:
+            raise LookupError(f'Задача {job.name} не зарегистрирована')
+        payload = json.loads(job.payload)
+        func(*payload['args'], **payload['kwargs'])
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_at = timezone.now() + timedelta(
+                seconds=backoff(job.attempts))
+        else:
+            job.status = Job.FAILED
+        logger.exception('Задача %s (попытка %s)', job, job.attempts)
+    else:
+        job.status = Job.DONE
+        job.last_error = ''
+    try:
+        with transaction.atomic():
+            job.save(update_fields=['status', 'run_at', 'last_error'])
+    except IntegrityError:
+        # Такая же задача уже снова стоит в очереди, повтор не нужен.
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.FAILED, last_error=job.last_error)
+
+
+def requeue_stale(timeout):
+    """Возвращает в очередь задачи упавших воркеров."""
+    stale = Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=timezone.now() - timedelta(seconds=timeout),
+    )
+    for job in stale:
+        job.status = Job.QUEUED
+        job.run_at = timezone.now()
+        try:
+            with transaction.atomic():
+                job.save(update_fields=['status', 'run_at'])
+        except IntegrityError:
+            Job.objects.filter(pk=job.pk).update(status=Job.FAILED)
+
+
+def discover():
+    autodiscover_modules('tasks')
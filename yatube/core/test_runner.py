@@ -0,0 +1,14 @@
+from django.test.runner import DiscoverRunner, default_test_processes
+
+
+class ParallelDiscoverRunner(DiscoverRunner):
+    """DiscoverRunner, по умолчанию запускающий тесты во всех ядрах.
+
+    Тестовые классы распределяются между процессами, у каждого процесса
+    своя копия тестовой базы. `--parallel 1` возвращает обычный режим.
+    """
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(parallel=default_test_processes())
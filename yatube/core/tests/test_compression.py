@@ -0,0 +1,82 @@
+import gzip
+from unittest import mock
+
+import brotli
+
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from ..middleware import CompressionMiddleware
+
+BODY = b'<p>' + b'yatube ' * 500 + b'</p>'
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def respond(self, response, encoding='gzip'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_gzip(self):
+        response = self.respond(HttpResponse(BODY))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(response['Content-Length'],
+                         str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_brotli_preferred(self):
+        """brotli выбирается, если клиент принимает обе кодировки."""
+        response = self.respond(HttpResponse(BODY), encoding='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), BODY)
+
+    def test_not_accepted(self):
+        response = self.respond(HttpResponse(BODY), encoding='identity')
+        self.assertEqual(response.content, BODY)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_skips_small_and_binary(self):
+        """Короткие ответы и изображения не сжимаются."""
+        small = self.respond(HttpResponse(b'<p>ok</p>'))
+        self.assertNotIn('Content-Encoding', small)
+        image = self.respond(HttpResponse(BODY, content_type='image/png'))
+        self.assertNotIn('Content-Encoding', image)
+
+    def test_streaming(self):
+        """Потоковый ответ сжимается по частям."""
+        response = self.respond(StreamingHttpResponse([BODY, BODY]))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)),
+            BODY + BODY,
+        )
+
+    def test_streaming_brotli(self):
+        response = self.respond(
+            StreamingHttpResponse([BODY, BODY]), encoding='br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertNotIn('Content-Length', response)
+        self.assertEqual(
+            brotli.decompress(b''.join(response.streaming_content)),
+            BODY + BODY,
+        )
+
+    def test_cacheable_body_compressed_once(self):
+        """Повторный кэшируемый ответ берёт сжатое тело из кэша."""
+        def cached_response():
+            response = HttpResponse(BODY)
+            response['Cache-Control'] = 'max-age=60'
+            return response
+
+        first = self.respond(cached_response())
+        with mock.patch('core.middleware.compress_body') as compress_body:
+            second = self.respond(cached_response())
+        compress_body.assert_not_called()
+        self.assertEqual(second.content, first.content)
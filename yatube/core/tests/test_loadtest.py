@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post, User
+from ..loadtest import LIMITED, parse_mix, worker
+
+
+class LoadTestTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='reader', password='secret-pass')
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.post = Post.objects.create(
+            author=cls.user, group=group, text='пост')
+
+    def config(self, mix):
+        return {
+            'url': None,
+            'host': settings.ALLOWED_HOSTS[0],
+            'mix': parse_mix(mix),
+            'warmup': 1,
+            'sample': {
+                'posts': [self.post.pk],
+                'users': ['reader'],
+                'feeds': [reverse('posts:index')],
+                'password': 'secret-pass',
+            },
+        }
+
+    def test_scenarios_through_wsgi_application(self):
+        """Потоки здесь не нужны: worker работает в потоке теста."""
+        results = worker(self.config('feed,detail,login,write'), 8, seed=1)
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(ok for _, _, _, ok in results), results)
+        writes = sum(name == 'write' for name, _, _, _ in results)
+        self.assertGreaterEqual(Comment.objects.count(), writes)
+
+    def test_wrong_password_is_error(self):
+        config = self.config('login')
+        config['sample']['password'] = 'wrong'
+        results = worker(config, 2, seed=1)
+        self.assertFalse(any(ok for _, _, _, ok in results))
+
+    @override_settings(
+        RATELIMIT_ENABLED=True,
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    )
+    def test_rate_limited_writes_counted_separately(self):
+        results = worker(self.config('write'), 12, seed=1)
+        outcomes = [ok for _, _, _, ok in results]
+        self.assertIn(LIMITED, outcomes)
+        self.assertNotIn(False, outcomes)
+
+    def test_parse_mix(self):
+        self.assertEqual(
+            parse_mix('feed=3, write'), [('feed', 3.0), ('write', 1.0)])
+        with self.assertRaises(ValueError):
+            parse_mix('delete=1')
@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+
+from ..views import media
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_SENDFILE='')
+class MediaViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(MEDIA_ROOT, 'posts'), exist_ok=True)
+        with open(os.path.join(MEDIA_ROOT, 'posts', 'pic.gif'), 'wb') as f:
+            f.write(bytes(range(100)))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def get(self, **headers):
+        request = RequestFactory().get('/media/posts/pic.gif', **headers)
+        return media(request, 'posts/pic.gif')
+
+    def test_full_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content),
+                         bytes(range(100)))
+        self.assertEqual(response['Content-Type'], 'image/gif')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+
+    def test_range(self):
+        """Запрос с Range получает 206 и только запрошенные байты."""
+        response = self.get(HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(b''.join(response.streaming_content),
+                         bytes(range(10, 20)))
+        tail = self.get(HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(tail.streaming_content),
+                         bytes(range(95, 100)))
+
+    def test_unsatisfiable_range(self):
+        response = self.get(HTTP_RANGE='bytes=200-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_stale_if_range_returns_full_file(self):
+        response = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_not_modified(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    @override_settings(MEDIA_SENDFILE='x-accel-redirect')
+    def test_accel_redirect(self):
+        """Файл передаётся nginx через внутренний location."""
+        response = self.get()
+        self.assertEqual(
+            response['X-Accel-Redirect'], '/protected-media/posts/pic.gif')
+        self.assertEqual(response.content, b'')
+
+    @override_settings(MEDIA_SENDFILE='x-sendfile')
+    def test_sendfile(self):
+        self.assertEqual(
+            self.get()['X-Sendfile'],
+            os.path.join(MEDIA_ROOT, 'posts', 'pic.gif'),
+        )
+
+    def test_path_outside_media_root(self):
+        request = RequestFactory().get('/media/../settings.py')
+        with self.assertRaises(Http404):
+            media(request, '../settings.py')
@@ -0,0 +1,56 @@
+import tracemalloc
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import User
+from .. import memprofile
+
+retained = []
+
+
+class MemoryProfileTests(TestCase):
+    def tearDown(self):
+        # Трассировка замедляет все остальные тесты.
+        tracemalloc.stop()
+        memprofile.reports.clear()
+        retained.clear()
+
+    def test_profile_finds_allocation_site(self):
+        with memprofile.Profile() as profile:
+            retained.append([bytearray(1024) for _ in range(100)])
+        top = profile.stats[0]
+        self.assertTrue(
+            top['site'].startswith('core/tests/test_memprofile.py:'), top)
+        self.assertGreater(top['size_diff'], 100 * 1024)
+
+    @override_settings(MEMPROFILE_ENABLED=True, MEMPROFILE_SAMPLE_RATE=1)
+    def test_sampled_requests_reported_to_staff(self):
+        url = reverse('memprofile')
+        client = Client()
+        client.get(reverse('about:author'))
+        self.assertEqual(len(memprofile.reports), 1)
+        self.assertEqual(memprofile.reports[0]['path'], '/about/author/')
+        # Не персонал отправляется на вход в админку.
+        self.assertEqual(client.get(url).status_code, 302)
+        staff = User.objects.create_user(username='admin', is_staff=True)
+        client.force_login(staff)
+        response = client.post(url)
+        self.assertContains(response, 'Рост с базового снимка')
+        self.assertContains(response, 'GET /about/author/')
+
+    def test_endpoint_without_tracing(self):
+        client = Client()
+        client.force_login(
+            User.objects.create_user(username='admin', is_staff=True))
+        self.assertEqual(client.get(reverse('memprofile')).status_code, 404)
+
+    def test_command(self):
+        out = StringIO()
+        call_command(
+            'memprofile', reverse('about:author'),
+            requests=2, warmup=1, stdout=out,
+        )
+        self.assertIn('2 запросов', out.getvalue())
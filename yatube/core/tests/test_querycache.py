@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from posts.models import Group
+
+from ..querycache import cached
+
+User = get_user_model()
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class QueryCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(
+            title='Первая', slug='first', description='описание')
+        cls.other = Group.objects.create(
+            title='Вторая', slug='second', description='описание')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_repeated_lookup_served_from_cache(self):
+        Group.objects.cached().get(slug='first')
+        with self.assertNumQueries(0):
+            group = Group.objects.cached().get(slug='first')
+        self.assertEqual(group, self.group)
+
+    @override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+    def test_replicas_not_used(self):
+        """Кэшируемые выборки читают основную базу под одним ключом."""
+        queryset = Group.objects.cached().filter(slug='first')
+        self.assertEqual(list(queryset), [self.group])
+        self.assertEqual(queryset.db, 'default')
+        with self.assertNumQueries(0):
+            list(Group.objects.cached().filter(slug='first'))
+
+    def test_row_lookup_survives_other_rows_changes(self):
+        """Запись в другую строку не сбрасывает выборку по slug."""
+        Group.objects.cached().get(slug='first')
+        self.other.title = 'Новое название'
+        self.other.save()
+        with self.assertNumQueries(0):
+            Group.objects.cached().get(slug='first')
+
+    def test_row_change_invalidates(self):
+        Group.objects.cached().get(slug='first')
+        self.group.title = 'Новое название'
+        self.group.save()
+        with self.assertNumQueries(1):
+            group = Group.objects.cached().get(slug='first')
+        self.assertEqual(group.title, 'Новое название')
+
+    def test_list_invalidated_by_any_write(self):
+        """Список зависит от всей таблицы: новая строка сбрасывает его."""
+        self.assertEqual(len(Group.objects.cached().order_by('slug')), 2)
+        Group.objects.create(title='Третья', slug='third', description='-')
+        self.assertEqual(len(Group.objects.cached().order_by('slug')), 3)
+
+    def test_update_invalidates(self):
+        Group.objects.cached().get(slug='first')
+        Group.objects.filter(slug='first').update(title='Через update')
+        group = Group.objects.cached().get(slug='first')
+        self.assertEqual(group.title, 'Через update')
+
+    def test_missing_row_cached_until_created(self):
+        self.assertFalse(Group.objects.cached().filter(slug='new'))
+        with self.assertNumQueries(0):
+            self.assertFalse(Group.objects.cached().filter(slug='new'))
+        Group.objects.create(title='Новая', slug='new', description='-')
+        self.assertTrue(Group.objects.cached().filter(slug='new'))
+
+    def test_cached_helper_for_plain_manager(self):
+        user = User.objects.create_user(username='reader')
+        cached(User.objects.all()).get(username='reader')
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                cached(User.objects.all()).get(username='reader'), user)
+
+    def test_empty_in_lookup(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(list(Group.objects.cached().filter(pk__in=[])),
+                             [])
@@ -0,0 +1,91 @@
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Post, User
+from ..models import RateLimitCounter
+from ..ratelimit import db_hit, ratelimit
+
+
+@ratelimit('2/m')
+def view(request):
+    return HttpResponse('ok')
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username='user')
+
+    def request(self, method='post', ip='10.0.0.1', user=None):
+        request = getattr(self.factory, method)('/', REMOTE_ADDR=ip)
+        request.user = user or mock.Mock(is_authenticated=False)
+        return request
+
+    def test_limit_per_ip(self):
+        with mock.patch('core.ratelimit.time.time', return_value=125.0):
+            self.assertEqual(view(self.request()).status_code, 200)
+            self.assertEqual(view(self.request()).status_code, 200)
+            response = view(self.request())
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response['Retry-After'], '55')
+            # Другой адрес считается отдельно, GET не считается.
+            other = view(self.request(ip='10.0.0.2'))
+            self.assertEqual(other.status_code, 200)
+            self.assertEqual(view(self.request('get')).status_code, 200)
+        with mock.patch('core.ratelimit.time.time', return_value=185.0):
+            self.assertEqual(view(self.request()).status_code, 200)
+
+    def test_limit_per_user(self):
+        """Пользователь ограничен с любого адреса."""
+        view(self.request(ip='10.0.0.1', user=self.user))
+        view(self.request(ip='10.0.0.2', user=self.user))
+        response = view(self.request(ip='10.0.0.3', user=self.user))
+        self.assertEqual(response.status_code, 429)
+
+    def test_comment_view_limited(self):
+        post = Post.objects.create(author=self.user, text='пост')
+        self.client.force_login(self.user)
+        url = reverse('posts:add_comment', kwargs={'post_id': post.pk})
+        with mock.patch('core.ratelimit.time.time', return_value=0.0):
+            codes = [
+                self.client.post(url, {'text': 'спам'}).status_code
+                for _ in range(11)
+            ]
+        self.assertEqual(codes, [302] * 10 + [429])
+        self.assertEqual(post.comments.count(), 10)
+
+    def test_file_cache_counts_in_database(self):
+        """Файловый кэш теряет приращения: счётчики хранятся в базе."""
+        with tempfile.TemporaryDirectory() as location, self.settings(
+            CACHES={'default': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': location,
+            }},
+        ), mock.patch('core.ratelimit.time.time', return_value=125.0):
+            codes = [view(self.request()).status_code for _ in range(3)]
+        self.assertEqual(codes, [200, 200, 429])
+        [counter] = RateLimitCounter.objects.all()
+        self.assertEqual(counter.count, 3)
+        self.assertFalse(cache.get(counter.key))
+
+    def test_database_counters_expire(self):
+        """Новое окно удаляет истёкшие счётчики."""
+        db_hit('old', 60)
+        RateLimitCounter.objects.update(
+            expires=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(db_hit('new', 60), 1)
+        self.assertEqual(
+            list(RateLimitCounter.objects.values_list('key', flat=True)),
+            ['new'])
@@ -0,0 +1,56 @@
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from posts.models import Post, User
+from ..middleware import ReplicaPinningMiddleware
+from ..routers import ReplicaRouter, is_pinned, pin_to_primary
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        pin_to_primary(False)
+
+    def test_reads_go_to_replica(self):
+        """Чтения постов идут в реплику, записи в основную базу."""
+        self.assertEqual(self.router.db_for_read(Post), 'replica1')
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_other_apps_read_primary(self):
+        """Пользователи и сессии читаются из основной базы."""
+        self.assertIsNone(self.router.db_for_read(User))
+
+    def test_pinned_reads_go_to_primary(self):
+        """Закреплённый поток читает из основной базы."""
+        pin_to_primary()
+        self.assertIsNone(self.router.db_for_read(Post))
+
+    def test_replicas_not_migrated(self):
+        """Миграции к репликам не применяются."""
+        self.assertFalse(self.router.allow_migrate('replica1', 'posts'))
+        self.assertIsNone(self.router.allow_migrate('default', 'posts'))
+
+    def test_write_request_sets_pin_cookie(self):
+        """После записи пользователь закреплён за основной базой."""
+        def view(request):
+            self.assertTrue(is_pinned())
+            return HttpResponse()
+
+        response = ReplicaPinningMiddleware(view)(self.factory.post('/'))
+        self.assertIn('pin_primary', response.cookies)
+        self.assertFalse(is_pinned())
+
+    def test_pin_cookie_pins_reads(self):
+        """Cookie закрепления направляет чтения в основную базу."""
+        def view(request):
+            self.assertTrue(is_pinned())
+            return HttpResponse()
+
+        request = self.factory.get('/')
+        request.COOKIES['pin_primary'] = '1'
+        response = ReplicaPinningMiddleware(view)(request)
+        self.assertNotIn('pin_primary', response.cookies)
@@ -0,0 +1,29 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+
+class PurgeSessionsTests(TestCase):
+    def test_purge_expired_in_batches(self):
+        """Удаляются только истёкшие сессии, пачками."""
+        now = timezone.now()
+        Session.objects.bulk_create(
+            Session(
+                session_key=f'expired{i}', session_data='',
+                expire_date=now - timedelta(days=1),
+            )
+            for i in range(5)
+        )
+        Session.objects.create(
+            session_key='alive', session_data='',
+            expire_date=now + timedelta(days=1),
+        )
+        out = StringIO()
+        call_command('purge_sessions', batch_size=2, sleep=0, stdout=out)
+        self.assertIn('5', out.getvalue())
+        self.assertEqual(
+            list(Session.objects.values_list('pk', flat=True)), ['alive'])
@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+
+from ..checks import check_log_dirs
+from ..slow_queries import fingerprint
+from ..utils import make_log_dirs
+
+
+class SlowQueryLogTests(TestCase):
+    def test_fingerprint_normalizes_literals(self):
+        """Литералы и списки IN заменяются плейсхолдерами."""
+        self.assertEqual(
+            fingerprint(
+                "SELECT * FROM t WHERE id IN (%s, %s,  %s)\n"
+                "AND name = 'x' AND n > 10"
+            ),
+            'SELECT * FROM t WHERE id IN (...) AND name = ? AND n > ?',
+        )
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_middleware_logs_call_site(self):
+        """Медленный запрос пишется в журнал с именем URL и местом вызова."""
+        with self.assertLogs('yatube.slow_queries', level='INFO') as logs:
+            Client().get('/group/unknown/')
+        entries = [json.loads(record.getMessage()) for record in logs.records]
+        entry = entries[0]
+        self.assertTrue(entry['slow'])
+        self.assertEqual(entry['url_name'], 'posts:postsname')
+        self.assertTrue(entry['call_site'].startswith('posts/views.py:'))
+        self.assertIn('posts_group', entry['fingerprint'])
+
+    def test_report_command(self):
+        """Команда slow_queries группирует записи по отпечатку запроса."""
+        entry = {
+            'time': 0, 'duration_ms': 150.0, 'slow': True, 'db': 'default',
+            'fingerprint': 'SELECT ? FROM posts_post', 'url_name': 'x',
+            'path': '/', 'call_site': 'posts/views.py:1', 'template': None,
+        }
+        with tempfile.TemporaryDirectory() as log_dir:
+            log_file = os.path.join(log_dir, 'slow.log')
+            with open(log_file, 'w') as log:
+                log.write(json.dumps(entry) + '\n')
+                log.write(json.dumps(dict(entry, duration_ms=50.0)) + '\n')
+            out = StringIO()
+            call_command('slow_queries', log_file=log_file, stdout=out)
+        self.assertIn('200.0 ms total', out.getvalue())
+        self.assertIn('2 calls', out.getvalue())
+        self.assertIn('posts/views.py:1 (2)', out.getvalue())
+
+    def test_log_dirs_created_on_startup(self):
+        """Каталоги журналов создаются при запуске, а не в settings."""
+        with tempfile.TemporaryDirectory() as root:
+            directory = os.path.join(root, 'logs')
+            logging = {'handlers': {'file': {
+                'class': 'logging.FileHandler',
+                'filename': os.path.join(directory, 'app.log'),
+                'delay': True,
+            }}}
+            with self.settings(LOGGING=logging):
+                [warning] = check_log_dirs(None)
+                self.assertEqual(warning.id, 'core.W002')
+                make_log_dirs()
+                self.assertTrue(os.path.isdir(directory))
+                self.assertEqual(check_log_dirs(None), [])
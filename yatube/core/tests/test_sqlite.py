@@ -0,0 +1,33 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from ..sqlite import apply_pragmas
+
+
+class SQLitePragmaTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        """Настройки из SQLITE_PRAGMAS применены к соединению."""
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('temp_store'), 2)
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -1234})
+    def test_pragmas_configurable(self):
+        """Набор PRAGMA берётся из настроек."""
+        apply_pragmas(sender=None, connection=connection)
+        self.assertEqual(self.pragma('cache_size'), -1234)
+
+    def test_db_maintenance(self):
+        """db_maintenance выполняет ANALYZE и PRAGMA optimize."""
+        out = StringIO()
+        call_command('db_maintenance', stdout=out)
+        self.assertIn('ANALYZE', out.getvalue())
+        self.assertIn('PRAGMA optimize', out.getvalue())
@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+
+import brotli
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+
+STATIC_ROOT = tempfile.mkdtemp()
+STATIC_DIR = tempfile.mkdtemp()
+
+
+@override_settings(
+    STATIC_ROOT=STATIC_ROOT,
+    STATICFILES_DIRS=[STATIC_DIR],
+    STATICFILES_STORAGE='core.storage.CompressedManifestStaticFilesStorage',
+    STATICFILES_FINDERS=[
+        'django.contrib.staticfiles.finders.FileSystemFinder',
+    ],
+    SERVE_STATIC=True,
+)
+class StaticFilesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with open(os.path.join(STATIC_DIR, 'site.css'), 'w') as css:
+            css.write('body { margin: 0; }\n' * 200)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.url = staticfiles_storage.url('site.css')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        shutil.rmtree(STATIC_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_collectstatic_writes_compressed_copies(self):
+        """collectstatic сохраняет хэшированный файл и его .gz/.br копии."""
+        name = self.url[len('/static/'):]
+        self.assertNotEqual(name, 'site.css')
+        path = os.path.join(STATIC_ROOT, name)
+        self.assertTrue(os.path.exists(path + '.gz'))
+        with open(path, 'rb') as source, open(path + '.br', 'rb') as copy:
+            self.assertEqual(brotli.decompress(copy.read()), source.read())
+
+    def test_hashed_file_is_immutable(self):
+        """Файл с хэшем отдаётся сжатым и кэшируется навсегда."""
+        response = Client().get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_brotli_copy_preferred(self):
+        response = Client().get(self.url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        body = b''.join(response.streaming_content)
+        self.assertEqual(
+            brotli.decompress(body), b'body { margin: 0; }\n' * 200)
+
+    def test_plain_name_is_revalidated(self):
+        response = Client().get('/static/site.css')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertNotIn('Content-Encoding', response)
+        again = Client().get(
+            '/static/site.css', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_missing_file(self):
+        self.assertEqual(Client().get('/static/missing.css').status_code, 404)
@@ -0,0 +1,71 @@
+from django.test import TestCase, override_settings
+
+from .. import tasks
+from ..models import Job
+
+calls = []
+
+
+@tasks.task(max_attempts=2)
+def record(value):
+    calls.append(value)
+
+
+@tasks.task(max_attempts=2)
+def explode():
+    raise ValueError('сбой')
+
+
+@override_settings(TASKS_EAGER=False)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def run_next(self):
+        job = tasks.claim('test')
+        tasks.run(job)
+        job.refresh_from_db()
+        return job
+
+    def test_enqueue_and_run(self):
+        """Задача попадает в очередь и выполняется воркером."""
+        tasks.enqueue(record, 'значение')
+        self.assertEqual(calls, [])
+        job = self.run_next()
+        self.assertEqual(calls, ['значение'])
+        self.assertEqual(job.status, Job.DONE)
+        self.assertIsNone(tasks.claim('test'))
+
+    def test_idempotency_key(self):
+        """Повторная постановка с тем же ключом не дублирует задачу."""
+        first = tasks.enqueue(record, 1, key='k')
+        second = tasks.enqueue(record, 2, key='k')
+        self.assertEqual(first.pk, second.pk)
+        self.run_next()
+        # После запуска задачу с тем же ключом можно поставить снова.
+        tasks.enqueue(record, 3, key='k')
+        self.assertEqual(Job.objects.count(), 2)
+
+    def test_delayed_job_not_claimed(self):
+        """Отложенная задача не запускается раньше времени."""
+        tasks.enqueue(record, 1, delay=60)
+        self.assertIsNone(tasks.claim('test'))
+
+    def test_retry_with_backoff(self):
+        """Упавшая задача повторяется с паузой, затем помечается ошибкой."""
+        tasks.enqueue(explode)
+        job = self.run_next()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn('ValueError', job.last_error)
+        self.assertIsNone(tasks.claim('test'))
+        Job.objects.update(run_at=job.created)
+        job = self.run_next()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode(self):
+        """В режиме TASKS_EAGER задача выполняется сразу."""
+        tasks.enqueue(record, 'сразу')
+        self.assertEqual(calls, ['сразу'])
+        self.assertFalse(Job.objects.exists())
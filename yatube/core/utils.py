@@ -0,0 +1,33 @@
+import os
+
+from django.conf import settings
+
+
+def percentile(values, fraction):
+    """Значение перцентиля fraction (0..1) по методу ближайшего ранга."""
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+def log_dirs():
+    """Каталоги файлов журналов из LOGGING."""
+    handlers = getattr(settings, 'LOGGING', {}).get('handlers', {})
+    return {
+        os.path.dirname(handler['filename'])
+        for handler in handlers.values()
+        if 'filename' in handler
+    }
+
+
+def make_log_dirs():
+    """Создаёт каталоги журналов при запуске, а не при импорте settings.
+
+    Ошибку (например, файловая система только для чтения) сообщает
+    проверка core.W002: запись в журнал не должна мешать запуску.
+    """
+    for directory in log_dirs():
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            pass
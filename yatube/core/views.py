@@ -0,0 +1,73 @@
+import mimetypes
+import time
+import tracemalloc
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_http_methods, require_safe
+
+from . import memprofile
+from .files import file_response, resolve
+
+
+@require_safe
+def media(request, path):
+    """Отдаёт загруженный файл из MEDIA_ROOT.
+
+    С MEDIA_SENDFILE файл передаётся фронт-серверу заголовком
+    X-Accel-Redirect (nginx) или X-Sendfile (Apache, lighttpd), иначе
+    отдаётся самим приложением с поддержкой Range и ETag.
+    """
+    fullpath = resolve(settings.MEDIA_ROOT, path)
+    if not settings.MEDIA_SENDFILE:
+        return file_response(
+            request, fullpath,
+            cache_control=settings.MEDIA_CACHE_CONTROL, ranges=True,
+        )
+    response = HttpResponse(
+        content_type=mimetypes.guess_type(fullpath)[0]
+        or 'application/octet-stream'
+    )
+    if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path))
+    else:
+        response['X-Sendfile'] = fullpath
+    response['Cache-Control'] = settings.MEDIA_CACHE_CONTROL
+    return response
+
+
+@never_cache
+@staff_member_required
+@require_http_methods(['GET', 'POST'])
+def memory_profile(request):
+    """Рост памяти этого процесса с базового снимка и последние отчёты
+    MemoryProfileMiddleware. POST делает текущее состояние базой."""
+    if not tracemalloc.is_tracing():
+        return HttpResponse(
+            'tracemalloc не запущен: включите MEMPROFILE_ENABLED',
+            content_type='text/plain; charset=utf-8', status=404,
+        )
+    if request.method == 'POST':
+        memprofile.set_baseline()
+    current, peak = tracemalloc.get_traced_memory()
+    lines = [
+        f'Отслеживается: {current / 2 ** 20:.1f} MiB, '
+        f'пик {peak / 2 ** 20:.1f} MiB',
+        '',
+        'Рост с базового снимка:',
+        *memprofile.format_stats(memprofile.baseline_diff()),
+    ]
+    for report in reversed(memprofile.reports):
+        moment = time.strftime('%H:%M:%S', time.localtime(report['time']))
+        lines += [
+            '',
+            f'{moment} {report["method"]} {report["path"]} '
+            f'({report["seconds"] * 1000:.0f} мс):',
+            *memprofile.format_stats(report['stats']),
+        ]
+    return HttpResponse(
+        '\n'.join(lines), content_type='text/plain; charset=utf-8')
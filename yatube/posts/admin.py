@@ -1,14 +1,86 @@
-from django.contrib import admin
-from .models import Post, Group
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.db import transaction
+from django.urls import reverse
+
+from core.cache import bump_page_version
+from core.paginator import EstimatedCountPaginator
+from . import archive, snapshots
+from .models import Post, Group, Follow
+from .sharding import sharding_enabled
+
+
+class MoveToGroupForm(ActionForm):
+    group = forms.ModelChoiceField(
+        Group.objects.all(), required=False, label='Группа',
+        empty_label='без группы',
+    )
+
+
+def move_to_group(modeladmin, request, queryset):
+    """Переносит выбранные посты в группу одним UPDATE.
+
+    UPDATE не вызывает сигналов, поэтому счётчики архива, кэш страниц и
+    снимки обновляются здесь.
+    """
+    form = MoveToGroupForm(request.POST)
+    form.fields['action'].choices = modeladmin.get_action_choices(request)
+    if not form.is_valid():
+        modeladmin.message_user(
+            request, 'Выберите группу', messages.ERROR)
+        return
+    group = form.cleaned_data['group']
+    queryset = queryset.exclude(group=group) if group else queryset.filter(
+        group__isnull=False)
+    with transaction.atomic():
+        rows = list(queryset.values_list('group_id', 'pub_date'))
+        moved = queryset.update(group=group)
+        archive.posts_moved(rows, group and group.pk)
+    bump_page_version()
+    if settings.SNAPSHOTS_ENABLED:
+        groups = {old for old, _ in rows} | {group and group.pk}
+        groups.discard(None)
+        snapshots.schedule([reverse('posts:index')] + [
+            reverse('posts:postsname', kwargs={'slug': slug})
+            for slug in Group.objects.filter(
+                pk__in=groups).values_list('slug', flat=True)
+        ])
+    modeladmin.message_user(request, f'Перенесено постов: {moved}')
+
+
+move_to_group.short_description = 'Перенести в группу'
+move_to_group.allowed_permissions = ('change',)
 
 
 class PostAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
-    list_editable = ('group',)
+    date_hierarchy = 'pub_date'
     empty_value_display = '-пусто-'
+    # Точный COUNT(*) всей таблицы на каждой странице не нужен.
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = MoveToGroupForm
+    actions = (move_to_group,)
+
+    # Админка работает с основной базой, то есть только с первым шардом:
+    # при шардировании посты в ней только просматриваются.
+    def has_add_permission(self, request):
+        return not sharding_enabled() and super().has_add_permission(request)
+
+    def has_change_permission(self, request, obj=None):
+        return not sharding_enabled() and super().has_change_permission(
+            request, obj)
+
+    def has_delete_permission(self, request, obj=None):
+        return not sharding_enabled() and super().has_delete_permission(
+            request, obj)
 
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
+admin.site.register(Follow)
@@ -1,5 +1,45 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from core import querycache
+        from . import archive, pages, sharding, snapshots, trending
+        from .models import Comment, Follow, Group, Post
+
+        for model in (Post, Comment):
+            pre_save.connect(sharding.allocate_id, sender=model)
+        for model in (get_user_model(), Group):
+            post_save.connect(sharding.copy_to_shards, sender=model)
+            post_delete.connect(sharding.delete_from_shards, sender=model)
+
+        post_save.connect(snapshots.post_changed, sender=Post)
+        post_delete.connect(snapshots.post_changed, sender=Post)
+        post_save.connect(snapshots.group_changed, sender=Group)
+        post_delete.connect(snapshots.group_changed, sender=Group)
+        pre_save.connect(snapshots.remember_names, sender=get_user_model())
+        post_save.connect(snapshots.user_changed, sender=get_user_model())
+        for signal in (post_save, post_delete):
+            signal.connect(snapshots.follow_changed, sender=Follow)
+
+        pre_save.connect(archive.remember_previous, sender=Post)
+        post_save.connect(archive.post_saved, sender=Post)
+        post_delete.connect(archive.post_deleted, sender=Post)
+        for model in (get_user_model(), Group):
+            post_delete.connect(archive.scope_deleted, sender=model)
+        post_save.connect(trending.comment_saved, sender=Comment)
+        post_delete.connect(trending.post_deleted, sender=Post)
+
+        for signal in (post_save, post_delete):
+            signal.connect(pages.post_changed, sender=Post)
+            signal.connect(pages.comment_changed, sender=Comment)
+            signal.connect(pages.group_changed, sender=Group)
+        post_save.connect(pages.user_changed, sender=get_user_model())
+        post_delete.connect(pages.user_deleted, sender=get_user_model())
+
+        for model in (Post, Comment, Group, get_user_model()):
+            querycache.track(model)
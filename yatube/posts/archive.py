@@ -0,0 +1,161 @@
+import calendar
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import MonthlyPostCount, Post
+from .sharding import sharding_enabled
+
+ALL = 'all'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def post_scopes(author_id, group_id):
+    scopes = [ALL, author_scope(author_id)]
+    if group_id is not None:
+        scopes.append(group_scope(group_id))
+    return scopes
+
+
+def month_of(moment):
+    """Первое число месяца публикации в часовом поясе сайта."""
+    return timezone.localtime(moment).date().replace(day=1)
+
+
+def period(year, month=None, day=None):
+    """Границы [start, end) года, месяца или дня в часовом поясе сайта."""
+    if day is not None:
+        start = date(year, month, day)
+        end = start + timedelta(days=1)
+    elif month is not None:
+        start = date(year, month, 1)
+        end = start + timedelta(days=calendar.monthrange(year, month)[1])
+    else:
+        start, end = date(year, 1, 1), date(year + 1, 1, 1)
+    return tuple(
+        timezone.make_aware(datetime.combine(value, datetime.min.time()))
+        for value in (start, end)
+    )
+
+
+def months(scope):
+    """Месяцы с постами: [(month, count), ...], новые первыми."""
+    return list(
+        MonthlyPostCount.objects.filter(scope=scope, count__gt=0)
+        .values_list('month', 'count')
+    )
+
+
+def add(scopes, month, delta):
+    for scope in scopes:
+        rows = MonthlyPostCount.objects.filter(scope=scope, month=month)
+        if rows.update(count=F('count') + delta) or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                MonthlyPostCount.objects.create(
+                    scope=scope, month=month, count=delta)
+        except IntegrityError:
+            rows.update(count=F('count') + delta)
+
+
+def remember_previous(sender, instance, raw=False, using=None,
+                      update_fields=None, **kwargs):
+    """pre_save: группа и автор поста до изменения.
+
+    Один запрос на сохранение для счётчиков архива и снимков страниц.
+    """
+    instance._previous = None
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not {'group', 'author'} & set(
+            update_fields):
+        return
+    instance._previous = (
+        sender._default_manager.using(using).filter(pk=instance.pk)
+        .values_list('group_id', 'author_id').first()
+    )
+
+
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    month = month_of(instance.pub_date)
+    if created:
+        add(post_scopes(instance.author_id, instance.group_id), month, 1)
+        return
+    previous = getattr(instance, '_previous', None)
+    if previous is None:
+        return
+    group_id, author_id = previous
+    if group_id != instance.group_id:
+        if group_id is not None:
+            add([group_scope(group_id)], month, -1)
+        if instance.group_id is not None:
+            add([group_scope(instance.group_id)], month, 1)
+    if author_id != instance.author_id:
+        add([author_scope(author_id)], month, -1)
+        add([author_scope(instance.author_id)], month, 1)
+
+
+def post_deleted(sender, instance, **kwargs):
+    add(
+        post_scopes(instance.author_id, instance.group_id),
+        month_of(instance.pub_date), -1,
+    )
+
+
+def posts_moved(rows, group_id):
+    """Счётчики групп после переноса постов одним UPDATE (без сигналов).
+
+    rows - пары (старая группа, pub_date) перенесённых постов.
+    """
+    changes = Counter()
+    for old, pub_date in rows:
+        month = month_of(pub_date)
+        if old is not None:
+            changes[group_scope(old), month] -= 1
+        if group_id is not None:
+            changes[group_scope(group_id), month] += 1
+    for (scope, month), delta in changes.items():
+        if delta:
+            add([scope], month, delta)
+
+
+def scope_deleted(sender, instance, **kwargs):
+    """post_delete группы или пользователя: их счётчики больше не нужны."""
+    scope = (
+        group_scope(instance.pk) if sender._meta.model_name == 'group'
+        else author_scope(instance.pk)
+    )
+    MonthlyPostCount.objects.filter(scope=scope).delete()
+
+
+def rebuild():
+    """Пересчитывает таблицу счётчиков по всем шардам."""
+    counts = Counter()
+    aliases = settings.POST_SHARDS if sharding_enabled() else [None]
+    for alias in aliases:
+        rows = Post.objects.using(alias).values_list(
+            'author_id', 'group_id', 'pub_date')
+        for author_id, group_id, pub_date in rows.iterator():
+            for scope in post_scopes(author_id, group_id):
+                counts[scope, month_of(pub_date)] += 1
+    with transaction.atomic():
+        MonthlyPostCount.objects.all().delete()
+        MonthlyPostCount.objects.bulk_create(
+            MonthlyPostCount(scope=scope, month=month, count=value)
+            for (scope, month), value in counts.items()
+        )
+    return len(counts)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts import trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет из ленты популярного посты с затухшей активностью; '
+        'запускается периодически (cron)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Пересчитать оценки по комментариям, например после '
+                 'изменения TRENDING_HALF_LIFE',
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            rows = trending.rebuild()
+            self.stdout.write(f'Постов в ленте популярного: {rows}')
+            return
+        self.stdout.write(f'Удалено затухших постов: {trending.decay()}')
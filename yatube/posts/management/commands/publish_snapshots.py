@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.snapshots import all_paths, publish
+
+
+class Command(BaseCommand):
+    help = (
+        'Перерисовывает HTML-снимки главной, групп и популярных профилей '
+        'для анонимных читателей'
+    )
+
+    def handle(self, *args, **options):
+        if not settings.SNAPSHOTS_ENABLED:
+            raise CommandError('Снимки выключены (SNAPSHOTS_ENABLED)')
+        for path in all_paths():
+            state = 'готово' if publish(path) else 'удалено'
+            self.stdout.write(f'{path}: {state}')
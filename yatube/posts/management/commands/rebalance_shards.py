@@ -0,0 +1,82 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Max
+
+from posts.models import Comment, GlobalId, Group, Post
+from posts.sharding import copy_to_shards, shard_for_author, sharding_enabled
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует пользователей и группы во все шарды и переносит посты '
+        'с комментариями в шард, вычисленный по автору'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true')
+
+    def sync_reference_data(self):
+        for model in (User, Group):
+            objects = model._default_manager.using(DEFAULT_DB_ALIAS)
+            for instance in objects.iterator():
+                copy_to_shards(model, instance, using=DEFAULT_DB_ALIAS)
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: скопировано '
+                f'{objects.count()}'
+            )
+
+    def advance_id_sequence(self):
+        # pk, выданные до включения шардирования, не должны повториться.
+        top = max(
+            model.objects.using(alias).aggregate(top=Max('pk'))['top'] or 0
+            for model in (Post, Comment)
+            for alias in settings.POST_SHARDS
+        )
+        current = GlobalId.objects.aggregate(top=Max('pk'))['top'] or 0
+        if top > current:
+            GlobalId.objects.create(pk=top)
+
+    def move_author(self, author_id, source, target):
+        posts = list(Post.objects.using(source).filter(author_id=author_id))
+        comments = list(
+            Comment.objects.using(source).filter(post__author_id=author_id))
+        # Сначала копируем, потом удаляем: при сбое посередине повторный
+        # запуск пропустит уже скопированные строки.
+        with transaction.atomic(using=target):
+            Post.objects.using(target).bulk_create(
+                posts, ignore_conflicts=True)
+            Comment.objects.using(target).bulk_create(
+                comments, ignore_conflicts=True)
+        with transaction.atomic(using=source):
+            Post.objects.using(source).filter(author_id=author_id).delete()
+        return len(posts), len(comments)
+
+    def handle(self, *args, **options):
+        if not sharding_enabled():
+            raise CommandError('Шардирование выключено (POST_SHARDS)')
+        if not options['dry_run']:
+            self.sync_reference_data()
+            self.advance_id_sequence()
+
+        for source in settings.POST_SHARDS:
+            author_ids = (
+                Post.objects.using(source)
+                .values_list('author_id', flat=True).distinct()
+            )
+            for author_id in list(author_ids):
+                target = shard_for_author(author_id)
+                if target == source:
+                    continue
+                if options['dry_run']:
+                    self.stdout.write(
+                        f'автор {author_id}: {source} -> {target}')
+                    continue
+                posts, comments = self.move_author(author_id, source, target)
+                self.stdout.write(
+                    f'автор {author_id}: {source} -> {target}, '
+                    f'постов {posts}, комментариев {comments}'
+                )
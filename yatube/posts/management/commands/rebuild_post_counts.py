@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.cache import bump_page_version
+from posts.archive import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает помесячные счётчики постов для архива, например '
+        'после массовых update() и delete() в обход сигналов'
+    )
+
+    def handle(self, *args, **options):
+        rows = rebuild()
+        bump_page_version()
+        self.stdout.write(f'Счётчиков за месяц: {rows}')
@@ -0,0 +1,57 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.cache import bump_page_version
+from posts import snapshots
+from posts.markup import MARKUP_VERSION
+from posts.models import Comment, Post
+from posts.sharding import sharding_enabled
+
+
+class Command(BaseCommand):
+    help = (
+        'Перерисовывает HTML постов и комментариев, отрисованный старой '
+        'версией разметки (после увеличения MARKUP_VERSION)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument(
+            '--sleep', type=float, default=0.1,
+            help='Пауза между пачками, чтобы пропустить запросы на запись',
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Перерисовать всё, а не только старые версии',
+        )
+
+    def handle(self, *args, **options):
+        aliases = settings.POST_SHARDS if sharding_enabled() else [None]
+        total = 0
+        for model in (Post, Comment):
+            for alias in aliases:
+                total += self.rerender(model.objects.using(alias), options)
+        if total:
+            bump_page_version()
+            if settings.SNAPSHOTS_ENABLED:
+                snapshots.schedule(snapshots.all_paths())
+        self.stdout.write(f'Перерисовано: {total}')
+
+    def rerender(self, rows, options):
+        stale = rows.order_by('pk')
+        if not options['all']:
+            stale = stale.filter(markup_version__lt=MARKUP_VERSION)
+        total, last = 0, 0
+        while True:
+            batch = list(stale.filter(pk__gt=last)[:options['batch_size']])
+            if not batch:
+                return total
+            for row in batch:
+                fields = row.render_text()
+            # update() внутри bulk_update сбрасывает кэш выборок.
+            rows.bulk_update(batch, fields)
+            total += len(batch)
+            last = batch[-1].pk
+            time.sleep(options['sleep'])
@@ -0,0 +1,34 @@
+import bleach
+import markdown
+
+# Увеличивается при изменении правил разметки: посты и комментарии со
+# старой версией перерисовывает команда rerender_markup.
+MARKUP_VERSION = 1
+
+MARKDOWN_EXTENSIONS = ('fenced_code', 'nl2br', 'sane_lists')
+
+ALLOWED_TAGS = (
+    'a', 'abbr', 'b', 'blockquote', 'br', 'code', 'em', 'h3', 'h4', 'h5',
+    'h6', 'hr', 'i', 'li', 'ol', 'p', 'pre', 'strong', 'ul',
+)
+ALLOWED_ATTRIBUTES = {'a': ['href', 'title'], 'abbr': ['title']}
+ALLOWED_PROTOCOLS = ('http', 'https', 'mailto')
+
+
+def set_nofollow(attrs, new=False):
+    attrs[(None, 'rel')] = 'nofollow noopener'
+    return attrs
+
+
+def render(text):
+    """Markdown в HTML без опасных тегов, атрибутов и ссылок."""
+    html = markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+    html = bleach.clean(
+        html,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        protocols=ALLOWED_PROTOCOLS,
+        strip=True,
+    )
+    return bleach.linkify(
+        html, callbacks=[set_nofollow], skip_tags=['code', 'pre'])
@@ -0,0 +1,49 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:05
+
+from django.db import migrations, models
+
+
+def make_excerpt(text, length=300):
+    """Копия posts.units.make_excerpt на момент миграции."""
+    if len(text) <= length:
+        return text
+    words = text[:length].rsplit(maxsplit=1)
+    if not words:
+        # Начало текста - одни пробелы: жёсткий обрез без них.
+        return text.lstrip()[:length].rstrip() + '…'
+    return words[0].rstrip() + '…'
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.using(schema_editor.connection.alias)
+    batch = []
+    for post in posts.only('pk', 'text').iterator(chunk_size=500):
+        post.excerpt = make_excerpt(post.text)
+        post.text_length = len(post.text)
+        batch.append(post)
+        if len(batch) == 500:
+            posts.bulk_update(batch, ['excerpt', 'text_length'])
+            batch = []
+    posts.bulk_update(batch, ['excerpt', 'text_length'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_follow_timelineentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Начало текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_length',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Длина текста'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
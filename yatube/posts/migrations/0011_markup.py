@@ -0,0 +1,97 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:08
+
+import bleach
+import markdown
+from django.db import migrations, models
+
+# Правила разметки версии 1 (posts.markup на момент миграции): старые
+# миграции не должны зависеть от текущего кода.
+MARKUP_VERSION = 1
+MARKDOWN_EXTENSIONS = ('fenced_code', 'nl2br', 'sane_lists')
+ALLOWED_TAGS = (
+    'a', 'abbr', 'b', 'blockquote', 'br', 'code', 'em', 'h3', 'h4', 'h5',
+    'h6', 'hr', 'i', 'li', 'ol', 'p', 'pre', 'strong', 'ul',
+)
+ALLOWED_ATTRIBUTES = {'a': ['href', 'title'], 'abbr': ['title']}
+ALLOWED_PROTOCOLS = ('http', 'https', 'mailto')
+
+
+def set_nofollow(attrs, new=False):
+    attrs[(None, 'rel')] = 'nofollow noopener'
+    return attrs
+
+
+def render(text):
+    html = markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+    html = bleach.clean(
+        html,
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        protocols=ALLOWED_PROTOCOLS,
+        strip=True,
+    )
+    return bleach.linkify(
+        html, callbacks=[set_nofollow], skip_tags=['code', 'pre'])
+
+
+def make_excerpt(text, length=300):
+    if len(text) <= length:
+        return text
+    words = text[:length].rsplit(maxsplit=1)
+    if not words:
+        # Начало текста - одни пробелы: жёсткий обрез без них.
+        return text.lstrip()[:length].rstrip() + '…'
+    return words[0].rstrip() + '…'
+
+
+def render_model(apps, schema_editor, name, fields):
+    model = apps.get_model('posts', name)
+    rows = model.objects.using(schema_editor.connection.alias)
+    batch = []
+    for row in rows.only('pk', 'text').iterator(chunk_size=500):
+        row.text_html = render(row.text)
+        row.markup_version = MARKUP_VERSION
+        if name == 'Post':
+            row.excerpt = render(make_excerpt(row.text))
+        batch.append(row)
+        if len(batch) == 500:
+            rows.bulk_update(batch, fields)
+            batch = []
+    rows.bulk_update(batch, fields)
+
+
+def render_markup(apps, schema_editor):
+    fields = ['text_html', 'markup_version']
+    render_model(apps, schema_editor, 'Post', [*fields, 'excerpt'])
+    render_model(apps, schema_editor, 'Comment', fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='markup_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Версия разметки'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='HTML текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='markup_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Версия разметки'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='HTML текста'),
+        ),
+        migrations.RunPython(render_markup, migrations.RunPython.noop),
+    ]
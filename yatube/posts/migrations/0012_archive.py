@@ -0,0 +1,71 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:12
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_counts(apps, schema_editor):
+    """Копия posts.archive.rebuild на момент миграции.
+
+    Шарды мигрируются по отдельности, поэтому при POST_SHARDS счётчики
+    по всем шардам пересчитывает manage.py rebuild_post_counts.
+    """
+    Post = apps.get_model('posts', 'Post')
+    MonthlyPostCount = apps.get_model('posts', 'MonthlyPostCount')
+    alias = schema_editor.connection.alias
+    counts = Counter()
+    rows = Post.objects.using(alias).values_list(
+        'author_id', 'group_id', 'pub_date')
+    for author_id, group_id, pub_date in rows.iterator():
+        month = timezone.localtime(pub_date).date().replace(day=1)
+        scopes = ['all', f'author:{author_id}']
+        if group_id is not None:
+            scopes.append(f'group:{group_id}')
+        for scope in scopes:
+            counts[scope, month] += 1
+    MonthlyPostCount.objects.using(alias).bulk_create(
+        MonthlyPostCount(scope=scope, month=month, count=value)
+        for (scope, month), value in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_markup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyPostCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=64)),
+                ('month', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('-month',),
+            },
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='pub_date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата публикации'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', '-pub_date'], name='post_group_pub_date'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', '-pub_date'], name='post_author_pub_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlypostcount',
+            constraint=models.UniqueConstraint(fields=('scope', 'month'), name='unique_scope_month'),
+        ),
+        migrations.RunPython(fill_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:45
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, migrations, models
+from django.db.models import Count
+
+
+def mark_pulled(apps, schema_editor):
+    """Посты популярных сейчас авторов читались при показе ленты: они
+    помечаются fanned_out=False, их записи в лентах удаляются, чтобы
+    пост был ровно в одной части ленты."""
+    Post = apps.get_model('posts', 'Post')
+    Follow = apps.get_model('posts', 'Follow')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    # Подписки и ленты живут в основной базе, посты - в каждом шарде.
+    popular = list(
+        Follow.objects.using(DEFAULT_DB_ALIAS).values('author')
+        .annotate(followers=Count('id'))
+        .filter(followers__gte=settings.TIMELINE_FANOUT_LIMIT)
+        .values_list('author', flat=True)
+    )
+    alias = schema_editor.connection.alias
+    Post.objects.using(alias).filter(author__in=popular).update(
+        fanned_out=False)
+    TimelineEntry.objects.using(DEFAULT_DB_ALIAS).filter(
+        author__in=popular).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_postscore'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='fanned_out',
+            field=models.BooleanField(default=True, editable=False, verbose_name='Разложен по лентам'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(fanned_out=False), fields=['-pub_date'], name='post_pulled_pub_date'),
+        ),
+        migrations.RunPython(mark_pulled, migrations.RunPython.noop),
+    ]
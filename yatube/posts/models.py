@@ -1,6 +1,10 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from core.querycache import CachingManager
+from . import markup
+from .units import EXCERPT_LENGTH, make_excerpt
+
 User = get_user_model()
 
 
@@ -9,15 +13,60 @@ class Group(models.Model):
     slug = models.SlugField(unique=True)
     description = models.TextField()
 
+    objects = CachingManager()
+
     def __str__(self) -> str:
         return self.title
 
 
-class Post(models.Model):
+class RenderedText(models.Model):
+    """Текст в Markdown и его HTML, отрисованный при сохранении."""
+    text_html = models.TextField('HTML текста', blank=True, editable=False)
+    markup_version = models.PositiveSmallIntegerField(
+        'Версия разметки', default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Текст, для которого в базе уже есть HTML.
+        instance._saved_text = instance.__dict__.get('text')
+        return instance
+
+    def render_text(self):
+        """Отрисовывает text; возвращает имена изменённых полей."""
+        self.text_html = markup.render(self.text)
+        self.markup_version = markup.MARKUP_VERSION
+        return ['text_html', 'markup_version']
+
+    def text_changed(self):
+        return (
+            self._state.adding
+            or self.text != getattr(self, '_saved_text', None)
+            or self.markup_version != markup.MARKUP_VERSION
+        )
+
+    def save(self, *args, **kwargs):
+        """Markdown отрисовывается, только если текст мог измениться."""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            if 'text' in update_fields:
+                kwargs['update_fields'] = {
+                    *update_fields, *self.render_text()}
+        elif 'text' not in self.get_deferred_fields() and self.text_changed():
+            self.render_text()
+        super().save(*args, **kwargs)
+        self._saved_text = self.__dict__.get('text')
+
+
+class Post(RenderedText):
     text = models.TextField(verbose_name='Текст поста',
                             help_text='Введите текст поста')
     pub_date = models.DateTimeField(auto_now_add=True,
                                     verbose_name='Дата публикации',
+                                    db_index=True,
                                     )
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="posts",
@@ -36,10 +85,30 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    # Ленты читают только HTML начала текста, text и text_html при этом
+    # откладываются.
+    excerpt = models.TextField('Начало текста', blank=True, editable=False)
+    text_length = models.PositiveIntegerField(
+        'Длина текста', default=0, editable=False)
+    # False - пост опубликован популярным автором и в ленты подписчиков
+    # не раскладывался: FollowFeed читает его при показе (posts.timeline).
+    fanned_out = models.BooleanField(
+        'Разложен по лентам', default=True, editable=False)
+
+    objects = CachingManager()
 
     def __str__(self):
         return self.text
 
+    @property
+    def truncated(self):
+        return self.text_length > EXCERPT_LENGTH
+
+    def render_text(self):
+        self.excerpt = markup.render(make_excerpt(self.text))
+        self.text_length = len(self.text)
+        return [*super().render_text(), 'excerpt', 'text_length']
+
     group = models.ForeignKey(
         Group,
         related_name='posts',
@@ -52,11 +121,21 @@ class Post(models.Model):
 
     class Meta:
         ordering = ['-pub_date']
+        # Архивы групп и авторов - диапазон дат внутри одного значения.
+        indexes = [
+            models.Index(
+                fields=['group', '-pub_date'], name='post_group_pub_date'),
+            models.Index(
+                fields=['author', '-pub_date'], name='post_author_pub_date'),
+            models.Index(
+                fields=['-pub_date'], name='post_pulled_pub_date',
+                condition=models.Q(fanned_out=False)),
+        ]
         # verbose_name = 'запись', 'Автор', 'пост'
         verbose_name_plural = 'записи', 'Авторы', 'посты'
 
 
-class Comment(models.Model):
+class Comment(RenderedText):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -74,6 +153,8 @@ class Comment(models.Model):
                             help_text='Введите текст комментария')
     created = models.DateTimeField('Дата публикации', auto_now_add=True)
 
+    objects = CachingManager()
+
     class Meta:
         ordering = ('created',)
         verbose_name = 'Комментарий'
@@ -82,3 +163,96 @@ class Comment(models.Model):
     def __str__(self):
         return self.text
 
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name='Подписчик',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Автор',
+    )
+
+    class Meta:
+        verbose_name = 'Подписка'
+        verbose_name_plural = 'Подписки'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'], name='unique_follow'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} -> {self.author}'
+
+
+class TimelineEntry(models.Model):
+    """Пост автора в персональной ленте подписчика (fan-out on write).
+
+    Хранит post_id без внешнего ключа: пост может лежать в другом шарде.
+    """
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='timeline')
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='+')
+    post_id = models.PositiveIntegerField()
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        ordering = ('-pub_date', '-post_id')
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post_id'],
+                name='timeline_user_pub_date'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post_id'], name='unique_timeline_post'),
+        ]
+
+
+class MonthlyPostCount(models.Model):
+    """Число постов за месяц для навигации по архиву (posts.archive).
+
+    scope - 'all', 'group:<pk>' или 'author:<pk>'; month - первое число
+    месяца.
+    """
+    scope = models.CharField(max_length=64)
+    month = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ('-month',)
+        constraints = [
+            models.UniqueConstraint(
+                fields=['scope', 'month'], name='unique_scope_month'),
+        ]
+
+    def __str__(self):
+        return f'{self.scope} {self.month:%Y-%m}: {self.count}'
+
+
+class PostScore(models.Model):
+    """Оценка поста для ленты популярного (posts.trending).
+
+    score - логарифм суммы весов комментариев exp((t - эпоха) / tau):
+    порядок по score совпадает с порядком по активности, затухающей со
+    временем, и не требует пересчёта всех строк. Как и TimelineEntry,
+    хранит post_id без внешнего ключа.
+    """
+    post_id = models.PositiveIntegerField(unique=True)
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ('-score',)
+        indexes = [models.Index(fields=['-score'], name='post_score')]
+
+
+class GlobalId(models.Model):
+    """Последовательность pk постов и комментариев в режиме шардирования."""
@@ -0,0 +1,80 @@
+from core.cache import bump_page_version
+from .models import Group, Post, User
+from .snapshots import NAME_FIELDS
+
+# Семейства страниц core.cache.versioned_cache_page. Запись сбрасывает
+# только страницы, на которых она видна: пост - ленту, свою группу,
+# профиль автора и свою страницу. Названия групп и имена пользователей
+# видны почти везде, и их изменение сбрасывает все страницы.
+
+
+def group_family(slug):
+    return f'group:{slug}'
+
+
+def profile_family(username):
+    return f'profile:{username}'
+
+
+def post_family(post_id):
+    return f'post:{post_id}'
+
+
+def post_families(group_id, author_id):
+    # Группа или автор могут быть уже удалены (каскадное удаление).
+    families = [
+        group_family(slug) for slug in Group.objects.filter(
+            pk=group_id).values_list('slug', flat=True)]
+    families += [
+        profile_family(username) for username in User.objects.filter(
+            pk=author_id).values_list('username', flat=True)]
+    return families
+
+
+def post_changed(sender, instance, raw=False, created=None, using=None,
+                 **kwargs):
+    """post_save и post_delete поста.
+
+    Новый или удалённый пост меняет счётчик постов автора на страницах
+    всех его постов. Группа и автор до изменения берутся из _previous
+    (posts.archive.remember_previous).
+    """
+    if raw:
+        return
+    families = ['index', 'trending', post_family(instance.pk)]
+    previous = getattr(instance, '_previous', None)
+    if previous is not None:
+        families += post_families(*previous)
+    families += post_families(instance.group_id, instance.author_id)
+    if created is not False:
+        families += [
+            post_family(pk) for pk in Post.objects.using(using).filter(
+                author_id=instance.author_id).values_list('pk', flat=True)]
+    bump_page_version(*dict.fromkeys(families), using=using)
+
+
+def comment_changed(sender, instance, raw=False, using=None, **kwargs):
+    if not raw:
+        bump_page_version(
+            'trending', post_family(instance.post_id), using=using)
+
+
+def group_changed(sender, instance, raw=False, created=False, using=None,
+                  **kwargs):
+    # Новая группа ещё нигде не видна.
+    if not raw and not created:
+        bump_page_version(using=using)
+
+
+def user_changed(sender, instance, raw=False, using=None, **kwargs):
+    """post_save пользователя: его имя есть на всех страницах с его
+    постами и комментариями. Старое имя - из snapshots.remember_names."""
+    old = getattr(instance, '_snapshot_names', None)
+    if raw or old is None:
+        return
+    if old != tuple(getattr(instance, name) for name in NAME_FIELDS):
+        bump_page_version(using=using)
+
+
+def user_deleted(sender, instance, using=None, **kwargs):
+    bump_page_version(using=using)
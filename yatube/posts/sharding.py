@@ -0,0 +1,168 @@
+import copy
+import hashlib
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.base import ModelState
+from django.http import Http404
+
+SHARDED_MODELS = ('post', 'comment')
+
+
+def sharding_enabled():
+    return len(settings.POST_SHARDS) > 1
+
+
+def shard_for_author(author_id):
+    """Псевдоним базы, в которой живут посты автора."""
+    digest = hashlib.md5(str(author_id).encode()).hexdigest()
+    return settings.POST_SHARDS[int(digest, 16) % len(settings.POST_SHARDS)]
+
+
+def is_sharded(model):
+    return (
+        model._meta.app_label == 'posts'
+        and model._meta.model_name in SHARDED_MODELS
+    )
+
+
+class ShardRouter:
+    """Размещает Post и Comment по шардам в зависимости от автора поста.
+
+    Без подсказки instance роутер не знает шард, и выборка идёт в
+    основную базу, то есть видит только первый шард. Поэтому выборки по
+    нескольким авторам делаются явно через ShardedFeed и .using(), а
+    запись постов из админки при шардировании запрещена (posts.admin).
+    """
+
+    def shard_for_instance(self, model, instance):
+        if instance is None:
+            return None
+        if isinstance(instance, get_user_model()):
+            # Посты автора лежат в одном шарде, его комментарии - в разных.
+            if model._meta.model_name == 'post':
+                return shard_for_author(instance.pk)
+            return None
+        model_name = instance._meta.model_name
+        if model_name == 'post' and instance.author_id is not None:
+            return shard_for_author(instance.author_id)
+        if model_name == 'comment':
+            if type(instance).post.is_cached(instance):
+                return self.shard_for_instance(model, instance.post)
+            return instance._state.db
+        return None
+
+    def db_for_read(self, model, **hints):
+        if not sharding_enabled() or not is_sharded(model):
+            return None
+        return self.shard_for_instance(model, hints.get('instance'))
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Пользователи и группы копируются во все шарды.
+        if sharding_enabled() and (is_sharded(obj1) or is_sharded(obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ShardedFeed:
+    """Лента постов из всех шардов для Paginator.
+
+    Каждый шард отдаёт ключи (pub_date, pk) первых stop записей в
+    порядке -pub_date - это чтение только индекса, - ключи сливаются
+    k-way merge, и целиком загружаются лишь посты страницы. Страница N
+    всё равно стоит N страниц ключей с каждого шарда.
+    """
+
+    ordered = True
+
+    def __init__(self, queryset):
+        self.queryset = queryset.order_by('-pub_date', '-pk')
+
+    def count(self):
+        return sum(
+            self.queryset.using(alias).count()
+            for alias in settings.POST_SHARDS
+        )
+
+    def __len__(self):
+        return self.count()
+
+    def keys(self, alias, stop):
+        rows = self.queryset.using(alias).values_list('pub_date', 'pk')
+        return ((pub_date, pk, alias) for pub_date, pk in rows[:stop])
+
+    def __getitem__(self, item):
+        if isinstance(item, int):
+            return self[item:item + 1][0]
+        start, stop = item.start or 0, item.stop
+        merged = heapq.merge(
+            *(self.keys(alias, stop) for alias in settings.POST_SHARDS),
+            reverse=True,
+        )
+        page = list(islice(merged, start, stop))
+        by_alias = {}
+        for _, pk, alias in page:
+            by_alias.setdefault(alias, []).append(pk)
+        posts = {}
+        for alias, pks in by_alias.items():
+            posts.update(
+                (post.pk, post)
+                for post in self.queryset.using(alias).filter(pk__in=pks)
+            )
+        # Пост мог быть удалён между запросами.
+        return [posts[pk] for _, pk, _ in page if pk in posts]
+
+
+def post_feed(queryset):
+    if not sharding_enabled():
+        return queryset
+    return ShardedFeed(queryset)
+
+
+def get_post_or_404(queryset, pk):
+    """Ищет пост по pk во всех шардах (pk глобально уникальны)."""
+    aliases = settings.POST_SHARDS if sharding_enabled() else [None]
+    for alias in aliases:
+        try:
+            return queryset.using(alias).get(pk=pk)
+        except queryset.model.DoesNotExist:
+            continue
+    raise Http404(f'No {queryset.model._meta.object_name} matches pk={pk}')
+
+
+def allocate_id(sender, instance, **kwargs):
+    """pre_save: выдаёт Post и Comment глобальный pk из основной базы."""
+    from .models import GlobalId
+
+    if sharding_enabled() and instance.pk is None:
+        instance.pk = GlobalId.objects.using(DEFAULT_DB_ALIAS).create().pk
+
+
+def copy_to_shards(sender, instance, using, raw=False, **kwargs):
+    """post_save: копирует пользователя или группу во все шарды."""
+    if not sharding_enabled() or using != DEFAULT_DB_ALIAS:
+        return
+    for alias in settings.POST_SHARDS:
+        if alias == DEFAULT_DB_ALIAS:
+            continue
+        clone = copy.copy(instance)
+        clone._state = ModelState()
+        clone.save_base(using=alias, raw=True)
+
+
+def delete_from_shards(sender, instance, using, **kwargs):
+    """post_delete: удаляет копии пользователя или группы из шардов."""
+    if not sharding_enabled() or using != DEFAULT_DB_ALIAS:
+        return
+    for alias in settings.POST_SHARDS:
+        if alias != DEFAULT_DB_ALIAS:
+            sender._default_manager.using(alias).filter(
+                pk=instance.pk).delete()
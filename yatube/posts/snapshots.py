@@ -0,0 +1,195 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Count
+from django.http import Http404
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+from core.compression import compress
+from core.files import snapshot_file
+from core.tasks import enqueue_on_commit
+from .models import Follow, Group, User
+
+
+# Поля пользователя, которые видны на страницах со снимками.
+NAME_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def is_popular_profile(author_id):
+    followers = Follow.objects.filter(author_id=author_id).count()
+    return followers >= settings.SNAPSHOT_PROFILE_FOLLOWERS
+
+
+def profile_path(username):
+    return reverse('posts:profile', kwargs={'username': username})
+
+
+def post_paths(group_id, author_id):
+    """Страницы со снимками, на которых виден пост."""
+    # Группа или автор могут быть уже удалены (каскадное удаление).
+    paths = [reverse('posts:index')]
+    if group_id is not None:
+        slug = Group.objects.filter(
+            pk=group_id).values_list('slug', flat=True).first()
+        if slug is not None:
+            paths.append(reverse('posts:postsname', kwargs={'slug': slug}))
+    if is_popular_profile(author_id):
+        username = User.objects.filter(
+            pk=author_id).values_list('username', flat=True).first()
+        if username is not None:
+            paths.append(profile_path(username))
+    return paths
+
+
+def all_paths():
+    paths = [reverse('posts:index')]
+    paths += [
+        reverse('posts:postsname', kwargs={'slug': slug})
+        for slug in Group.objects.values_list('slug', flat=True)
+    ]
+    popular = (
+        User.objects.annotate(followers=Count('following'))
+        .filter(followers__gte=settings.SNAPSHOT_PROFILE_FOLLOWERS)
+        .values_list('username', flat=True)
+    )
+    paths += [profile_path(username) for username in popular]
+    return paths
+
+
+def render(path):
+    """Первая страница так, как её видит анонимный читатель."""
+    match = resolve(path)
+    request = RequestFactory().get(path)
+    request.user = AnonymousUser()
+    request.resolver_match = match
+    # Мимо cache_page: в кэше может лежать страница до изменения.
+    view = getattr(match.func, '__wrapped__', match.func)
+    try:
+        return view(request, *match.args, **match.kwargs)
+    except Http404:
+        return None
+
+
+def write_atomic(target, data):
+    fd, temp = tempfile.mkstemp(dir=os.path.dirname(target))
+    with os.fdopen(fd, 'wb') as file:
+        file.write(data)
+    os.chmod(temp, 0o644)
+    os.replace(temp, target)
+
+
+def remove(target):
+    for name in (target, target + '.gz', target + '.br'):
+        if os.path.exists(name):
+            os.remove(name)
+
+
+def wanted(path):
+    """Снимки профилей нужны только популярным авторам."""
+    match = resolve(path)
+    if match.view_name != 'posts:profile':
+        return True
+    author_id = User.objects.filter(
+        username=match.kwargs['username']).values_list('pk', flat=True)
+    return bool(author_id) and is_popular_profile(author_id[0])
+
+
+def publish(path):
+    """Перерисовывает снимок страницы; удаляет его, если страницы нет
+    или снимок ей больше не нужен."""
+    target = os.path.join(settings.SNAPSHOT_ROOT, snapshot_file(path))
+    response = render(path) if wanted(path) else None
+    if response is None or response.status_code != 200:
+        remove(target)
+        return False
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    for suffix, data in compress(response.content):
+        write_atomic(target + suffix, data)
+    write_atomic(target, response.content)
+    return True
+
+
+def schedule(paths):
+    """Ставит перерисовку в очередь с задержкой SNAPSHOT_DELAY.
+
+    Пока задача для страницы ждёт в очереди, новые записи не добавляют
+    задач (ключ идемпотентности), так что серия постов перерисует
+    страницу один раз.
+    """
+    from .tasks import publish_snapshot
+
+    for path in paths:
+        enqueue_on_commit(
+            publish_snapshot, path,
+            key=f'snapshot:{path}', delay=settings.SNAPSHOT_DELAY,
+        )
+
+
+def post_changed(sender, instance, raw=False, **kwargs):
+    """post_save и post_delete поста.
+
+    Страницы до изменения группы или автора берутся из _previous
+    (posts.archive.remember_previous).
+    """
+    if not settings.SNAPSHOTS_ENABLED or raw:
+        return
+    previous = getattr(instance, '_previous', None)
+    paths = post_paths(*previous) if previous is not None else []
+    paths += post_paths(instance.group_id, instance.author_id)
+    schedule(dict.fromkeys(paths))
+
+
+def group_changed(sender, instance, raw=False, **kwargs):
+    if settings.SNAPSHOTS_ENABLED and not raw:
+        schedule([reverse('posts:postsname', kwargs={'slug': instance.slug})])
+
+
+def remember_names(sender, instance, raw=False, update_fields=None,
+                   **kwargs):
+    """pre_save пользователя: имя и username до изменения (для снимков
+    и posts.pages)."""
+    instance._snapshot_names = None
+    if raw or instance.pk is None:
+        return
+    if update_fields is not None and not set(NAME_FIELDS) & set(
+            update_fields):
+        return
+    instance._snapshot_names = sender._default_manager.filter(
+        pk=instance.pk).values_list(*NAME_FIELDS).first()
+
+
+def user_changed(sender, instance, raw=False, **kwargs):
+    """post_save пользователя: его имя есть на лентах с его постами."""
+    old = getattr(instance, '_snapshot_names', None)
+    if not settings.SNAPSHOTS_ENABLED or raw or old is None:
+        return
+    if old == tuple(getattr(instance, name) for name in NAME_FIELDS):
+        return
+    paths = [reverse('posts:index')]
+    slugs = instance.posts.filter(group__isnull=False).values_list(
+        'group__slug', flat=True).distinct()
+    paths += [
+        reverse('posts:postsname', kwargs={'slug': slug}) for slug in slugs]
+    if is_popular_profile(instance.pk):
+        # Снимок по старому адресу удалится: страницы там больше нет.
+        paths += [profile_path(old[0]), profile_path(instance.username)]
+    schedule(dict.fromkeys(paths))
+
+
+def follow_changed(sender, instance, raw=False, created=None, **kwargs):
+    """post_save и post_delete подписки: профиль перешёл порог
+    SNAPSHOT_PROFILE_FOLLOWERS в ту или другую сторону."""
+    if not settings.SNAPSHOTS_ENABLED or raw or created is False:
+        return
+    followers = Follow.objects.filter(author_id=instance.author_id).count()
+    # Новая подписка (created) или удалённая (created is None).
+    crossed = settings.SNAPSHOT_PROFILE_FOLLOWERS - (created is None)
+    if followers != crossed:
+        return
+    username = User.objects.filter(pk=instance.author_id).values_list(
+        'username', flat=True).first()
+    if username is not None:
+        schedule([profile_path(username)])
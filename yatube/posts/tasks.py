@@ -0,0 +1,41 @@
+from sorl.thumbnail import get_thumbnail
+
+from core.tasks import task
+from . import snapshots, timeline
+from .models import Post, User
+from .sharding import shard_for_author, sharding_enabled
+
+# Те же параметры, что у {% thumbnail %} в шаблонах постов.
+THUMBNAIL_GEOMETRY = '960x339'
+THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+
+
+def load_post(post_id, author_id):
+    shard = shard_for_author(author_id) if sharding_enabled() else None
+    return Post.objects.using(shard).filter(pk=post_id).first()
+
+
+@task()
+def fan_out(post_id, author_id):
+    post = load_post(post_id, author_id)
+    if post is not None:
+        timeline.fan_out_post(post)
+
+
+@task()
+def backfill_timeline(user_id, author_id):
+    timeline.backfill(
+        User.objects.get(pk=user_id), User.objects.get(pk=author_id))
+
+
+@task(max_attempts=3)
+def make_thumbnails(post_id, author_id):
+    """Готовит миниатюры заранее, чтобы первый просмотр ленты не ждал."""
+    post = load_post(post_id, author_id)
+    if post is not None and post.image:
+        get_thumbnail(post.image, THUMBNAIL_GEOMETRY, **THUMBNAIL_OPTIONS)
+
+
+@task(max_attempts=3)
+def publish_snapshot(path):
+    snapshots.publish(path)
@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.contrib.admin import helpers
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.paginator import EstimatedCountPaginator
+from .. import archive
+from ..models import Group, MonthlyPostCount, Post, User
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'secret-pass')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.other = Group.objects.create(
+            title='Другая', slug='other', description='Описание')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.posts = [
+            Post.objects.create(
+                author=self.admin, group=self.group, text=f'пост {n}')
+            for n in range(5)
+        ]
+
+    def test_changelist_joins_related_rows(self):
+        url = reverse('admin:posts_post_changelist')
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(url)
+        for n in range(5):
+            author = User.objects.create_user(username=f'user{n}')
+            Post.objects.create(author=author, group=self.other, text='x')
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+        self.assertContains(response, 'user4')
+        self.assertEqual(len(many), len(few))
+
+    def test_move_to_group_is_single_update(self):
+        moved = self.posts[:3]
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('admin:posts_post_changelist'), {
+                'action': 'move_to_group',
+                'group': self.other.pk,
+                helpers.ACTION_CHECKBOX_NAME: [post.pk for post in moved],
+            })
+        updates = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('UPDATE "posts_post"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(
+            Post.objects.filter(group=self.other).count(), len(moved))
+        counts = dict(
+            MonthlyPostCount.objects.values_list('scope', 'count'))
+        self.assertEqual(counts[archive.group_scope(self.group.pk)], 2)
+        self.assertEqual(counts[archive.group_scope(self.other.pk)], 3)
+
+    def test_estimated_count_only_without_filters(self):
+        queryset = Post.objects.order_by('pk')
+        with mock.patch('core.paginator.estimated_count', return_value=10**6):
+            self.assertEqual(
+                EstimatedCountPaginator(queryset, 10).count, 10**6)
+            self.assertEqual(EstimatedCountPaginator(
+                queryset.filter(group=self.group), 10).count, 5)
+        with mock.patch('core.paginator.estimated_count', return_value=None):
+            self.assertEqual(EstimatedCountPaginator(queryset, 10).count, 5)
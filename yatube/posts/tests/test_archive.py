@@ -0,0 +1,121 @@
+from datetime import datetime
+from importlib import import_module
+from io import StringIO
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import archive
+from ..models import Group, MonthlyPostCount, Post, User
+
+
+def counts():
+    return dict(
+        MonthlyPostCount.objects.filter(count__gt=0)
+        .values_list('scope', 'count')
+    )
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.other = Group.objects.create(
+            title='Другая', slug='other', description='Описание')
+
+    def create(self, moment, **kwargs):
+        post = Post.objects.create(author=self.author, text='пост', **kwargs)
+        # pub_date заполняется auto_now_add; дату переносит update().
+        Post.objects.filter(pk=post.pk).update(pub_date=moment)
+        return post
+
+    def test_counts_follow_writes(self):
+        post = Post.objects.create(
+            author=self.author, group=self.group, text='пост')
+        author, group = f'author:{self.author.pk}', f'group:{self.group.pk}'
+        self.assertEqual(counts(), {'all': 1, author: 1, group: 1})
+        post.group = self.other
+        post.save()
+        other = f'group:{self.other.pk}'
+        self.assertEqual(counts(), {'all': 1, author: 1, other: 1})
+        post.delete()
+        self.assertEqual(counts(), {})
+
+    def test_author_change_moves_counts(self):
+        post = Post.objects.create(author=self.author, text='пост')
+        other = User.objects.create_user(username='other')
+        post.author = other
+        with CaptureQueriesContext(connection) as queries:
+            post.save()
+        selects = [
+            query for query in queries
+            if query['sql'].startswith('SELECT "posts_post"."group_id"')
+        ]
+        self.assertEqual(len(selects), 1)
+        self.assertEqual(counts(), {'all': 1, f'author:{other.pk}': 1})
+
+    def test_pages_do_not_depend_on_counts(self):
+        """Посты видны и без счётчиков, например до rebuild_post_counts."""
+        posts = [
+            self.create(timezone.make_aware(datetime(2021, 3, day)))
+            for day in (1, 2, 3)
+        ]
+        MonthlyPostCount.objects.all().delete()
+        response = self.client.get(
+            reverse('posts:archive', kwargs={'year': 2021, 'month': 3}))
+        page = response.context['page_obj']
+        self.assertEqual(page.paginator.count, 3)
+        self.assertEqual(list(page), posts[::-1])
+
+    def test_migration_fills_counts(self):
+        migration = import_module('posts.migrations.0012_archive')
+        self.create(timezone.make_aware(datetime(2021, 3, 5)))
+        MonthlyPostCount.objects.all().delete()
+        migration.fill_counts(apps, SimpleNamespace(connection=connection))
+        self.assertEqual(
+            archive.months(archive.ALL), [(datetime(2021, 3, 1).date(), 1)])
+
+    def test_rebuild(self):
+        self.create(timezone.make_aware(datetime(2021, 3, 5)))
+        self.create(timezone.make_aware(datetime(2021, 3, 31, 23)))
+        MonthlyPostCount.objects.all().delete()
+        call_command('rebuild_post_counts', stdout=StringIO())
+        self.assertEqual(
+            archive.months(archive.ALL), [(datetime(2021, 3, 1).date(), 2)])
+
+    def test_archive_pages(self):
+        march = self.create(
+            timezone.make_aware(datetime(2021, 3, 5)), group=self.group)
+        april = self.create(timezone.make_aware(datetime(2021, 4, 1)))
+        call_command('rebuild_post_counts', stdout=StringIO())
+        url = reverse('posts:archive', kwargs={'year': 2021, 'month': 3})
+        response = self.client.get(url)
+        self.assertEqual(list(response.context['page_obj']), [march])
+        self.assertEqual(response.context['page_obj'].paginator.count, 1)
+        response = self.client.get(
+            reverse('posts:archive', kwargs={'year': 2021}))
+        self.assertEqual(list(response.context['page_obj']), [april, march])
+        response = self.client.get(reverse(
+            'posts:group_archive',
+            kwargs={'slug': 'group', 'year': 2021, 'month': 4}))
+        self.assertEqual(list(response.context['page_obj']), [])
+        response = self.client.get(reverse(
+            'posts:profile_archive',
+            kwargs={'username': 'author', 'year': 2021, 'month': 4, 'day': 1}))
+        self.assertEqual(list(response.context['page_obj']), [april])
+        response = self.client.get(reverse('posts:archive'))
+        self.assertContains(
+            response,
+            reverse('posts:archive', kwargs={'year': 2021, 'month': 3}))
+        response = self.client.get(
+            reverse('posts:archive', kwargs={'year': 2021, 'month': 13}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,62 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post, User
+from ..units import EXCERPT_LENGTH, make_excerpt
+
+LONG_TEXT = ' '.join(['слово'] * 200) + ' конецтекста'
+
+
+class ExcerptTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text=LONG_TEXT)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_make_excerpt(self):
+        self.assertEqual(make_excerpt('короткий текст'), 'короткий текст')
+        excerpt = make_excerpt(LONG_TEXT)
+        self.assertLessEqual(len(excerpt), EXCERPT_LENGTH + 1)
+        self.assertTrue(excerpt.endswith('слово…'))
+        text = ' ' * EXCERPT_LENGTH + 'слово ' * 10
+        self.assertEqual(make_excerpt(text), 'слово ' * 9 + 'слово…')
+
+    def test_excerpt_updated_on_save(self):
+        self.assertEqual(self.post.text_length, len(LONG_TEXT))
+        self.assertTrue(self.post.truncated)
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'новый текст'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, '<p>новый текст</p>')
+        self.assertEqual(post.text_length, len('новый текст'))
+        self.assertFalse(post.truncated)
+
+    def test_lists_do_not_load_text(self):
+        """Ленты показывают начало поста и не читают text из базы."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:postsname', kwargs={'slug': 'group'}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+        )
+        detail = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertContains(response, self.post.excerpt)
+                self.assertNotContains(response, 'конецтекста')
+                self.assertContains(response, f'href="{detail}"')
+                for query in queries:
+                    self.assertNotIn('"posts_post"."text"', query['sql'])
@@ -0,0 +1,117 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Post, TimelineEntry, User
+from ..timeline import backfill
+
+
+class FollowTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(author=cls.author, text='старый пост')
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def follow(self):
+        self.reader_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': 'author'}))
+
+    def test_follow_backfills_timeline(self):
+        """Подписка добавляет в ленту последние посты автора."""
+        self.follow()
+        self.assertTrue(
+            Follow.objects.filter(user=self.reader, author=self.author)
+            .exists())
+        self.assertEqual(
+            list(self.reader.timeline.values_list('post_id', flat=True)),
+            [self.post.pk],
+        )
+
+    def test_cannot_follow_self(self):
+        """На себя подписаться нельзя."""
+        self.author_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': 'author'}))
+        self.assertFalse(Follow.objects.exists())
+
+    def test_new_post_fanned_out(self):
+        """Новый пост появляется в ленте подписчика и не у остальных."""
+        self.follow()
+        stranger = Client()
+        stranger.force_login(User.objects.create_user(username='stranger'))
+        self.author_client.post(
+            reverse('posts:post_create'), data={'text': 'новый пост'})
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        texts = [post.text for post in response.context['page_obj']]
+        self.assertEqual(texts, ['новый пост', 'старый пост'])
+        response = stranger.get(reverse('posts:follow_index'))
+        self.assertEqual(len(response.context['page_obj']), 0)
+
+    def test_unfollow_clears_timeline(self):
+        """Отписка удаляет подписку и посты автора из ленты."""
+        self.follow()
+        self.reader_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': 'author'}))
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_backfill_after_unfollow_skipped(self):
+        """Задача, дошедшая до воркера после отписки, ничего не добавляет."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        Follow.objects.all().delete()
+        backfill(self.reader, self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_popular_author_read_on_demand(self):
+        """Посты популярного автора не копируются, а читаются из ленты."""
+        self.follow()
+        self.author_client.post(
+            reverse('posts:post_create'), data={'text': 'новый пост'})
+        new = Post.objects.get(text='новый пост')
+        self.assertFalse(new.fanned_out)
+        self.assertFalse(TimelineEntry.objects.filter(post_id=new.pk).exists())
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        texts = [post.text for post in response.context['page_obj']]
+        self.assertEqual(texts, ['новый пост', 'старый пост'])
+
+    def test_feed_survives_popularity_changes(self):
+        """Пост, опубликованный популярным автором, остаётся в ленте после
+        отписок, а счётчик ленты не считает посты дважды."""
+        self.follow()
+        with self.settings(TIMELINE_FANOUT_LIMIT=1):
+            self.author_client.post(
+                reverse('posts:post_create'), data={'text': 'популярный'})
+        self.author_client.post(
+            reverse('posts:post_create'), data={'text': 'обычный'})
+        for limit in (1, 1000):
+            with self.settings(TIMELINE_FANOUT_LIMIT=limit):
+                response = self.reader_client.get(
+                    reverse('posts:follow_index'))
+            page = response.context['page_obj']
+            self.assertEqual(
+                [post.text for post in page],
+                ['обычный', 'популярный', 'старый пост'])
+            self.assertEqual(page.paginator.count, 3)
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_migration_marks_popular_posts(self):
+        """Миграция переводит посты популярных авторов на чтение."""
+        migration = import_module('posts.migrations.0014_post_fanned_out')
+        self.follow()
+        self.assertTrue(TimelineEntry.objects.exists())
+        migration.mark_pulled(apps, SimpleNamespace(connection=connection))
+        self.post.refresh_from_db()
+        self.assertFalse(self.post.fanned_out)
+        self.assertFalse(TimelineEntry.objects.exists())
@@ -131,3 +131,20 @@ class PostCreateFormTests(TestCase):
         self.assertTrue(
             Comment.objects.filter(text='Новый комментарий').exists()
         )
+
+    def test_ajax_comment(self):
+        """XHR получает только новый комментарий или форму с ошибками."""
+        url = reverse('posts:add_comment', kwargs={'post_id': self.post.id})
+        response = self.authorized_author.post(
+            url, {'text': '**Новый** комментарий'},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.status_code, 201)
+        html = response.json()['comment']
+        self.assertIn('<strong>Новый</strong> комментарий', html)
+        self.assertNotIn('<html', html)
+        response = self.authorized_author.post(
+            url, {'text': ''}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('text-danger', response.json()['form'])
+        self.assertFalse(Comment.objects.filter(text='').exists())
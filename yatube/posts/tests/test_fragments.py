@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Follow, Post, User
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class SharedPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.post = Post.objects.create(author=cls.author, text='пост')
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_page_shared_between_users(self):
+        """Страница ленты не зависит от пользователя и кэшируется одна."""
+        url = reverse('posts:profile', kwargs={'username': 'author'})
+        first = self.author_client.get(url)
+        self.assertNotIn('Cookie', first.get('Vary', ''))
+        self.assertNotContains(first, 'Пользователь:')
+        with CaptureQueriesContext(connection) as queries:
+            second = self.reader_client.get(url)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(second.content, first.content)
+
+    def test_write_invalidates_pages(self):
+        url = reverse('posts:index')
+        self.reader_client.get(url)
+        Post.objects.create(author=self.author, text='новый пост')
+        self.assertContains(self.reader_client.get(url), 'новый пост')
+
+    def test_fragments(self):
+        """Шапка, кнопка подписки и ссылка редактирования - в фрагментах."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        parts = self.reader_client.get(
+            reverse('posts:fragments'), {'author': 'author'}).json()
+        self.assertIn('reader', parts['header'])
+        self.assertIn('Отписаться', parts['follow'])
+        parts = self.author_client.get(
+            reverse('posts:fragments'),
+            {'author': 'author', 'post': self.post.pk},
+        ).json()
+        self.assertIn('Редактировать', parts['post_actions'])
+        self.assertIn('csrfmiddlewaretoken', parts['comment_form'])
+
+    def test_fragments_for_guest(self):
+        parts = Client().get(
+            reverse('posts:fragments'),
+            {'author': 'author', 'post': self.post.pk},
+        ).json()
+        self.assertIn('Войти', parts['header'])
+        self.assertNotIn('Редактировать', parts['post_actions'])
+        self.assertNotIn('form', parts['comment_form'])
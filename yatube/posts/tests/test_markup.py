@@ -0,0 +1,72 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..markup import MARKUP_VERSION, render
+from ..models import Comment, Group, Post, User
+
+
+class MarkupTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.post = Post.objects.create(
+            author=cls.author, group=group,
+            text='**жирный** и [ссылка](https://ya.ru)')
+        cls.comment = Comment.objects.create(
+            post=cls.post, author=cls.author, text='*курсив*')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_render_sanitizes(self):
+        html = render(
+            '<script>alert(1)</script> [x](javascript:alert(1)) '
+            '<img src=x onerror=alert(1)>')
+        self.assertNotIn('<script', html)
+        self.assertNotIn('javascript:', html)
+        self.assertNotIn('<img', html)
+
+    def test_html_stored_on_save(self):
+        self.assertIn('<strong>жирный</strong>', self.post.text_html)
+        self.assertIn('rel="nofollow noopener"', self.post.text_html)
+        self.assertEqual(self.post.markup_version, MARKUP_VERSION)
+        self.assertEqual(self.comment.text_html, '<p><em>курсив</em></p>')
+
+    def test_rendered_only_when_text_changes(self):
+        post = Post.objects.get(pk=self.post.pk)
+        with mock.patch('posts.markup.render') as render_mock:
+            post.save(update_fields=['group'])
+            post.save()
+            render_mock.assert_not_called()
+            render_mock.return_value = '<p>новый</p>'
+            post.text = 'новый'
+            post.save()
+            self.assertEqual(render_mock.call_count, 2)
+        self.assertEqual(post.text_html, '<p>новый</p>')
+
+    def test_pages_show_stored_html(self):
+        response = Client().get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}))
+        self.assertContains(response, '<strong>жирный</strong>')
+        self.assertContains(response, '<em>курсив</em>')
+        response = Client().get(reverse('posts:index'))
+        self.assertContains(response, '<strong>жирный</strong>')
+
+    def test_rerender_command(self):
+        """Команда перерисовывает только HTML старой версии."""
+        Post.objects.filter(pk=self.post.pk).update(
+            text_html='', markup_version=0)
+        out = StringIO()
+        call_command('rerender_markup', sleep=0, stdout=out)
+        self.assertIn('Перерисовано: 1', out.getvalue())
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertIn('<strong>жирный</strong>', post.text_html)
+        self.assertEqual(post.markup_version, MARKUP_VERSION)
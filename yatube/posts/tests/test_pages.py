@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from core.cache import bump_page_version, page_versions
+from ..models import Comment, Group, Post, User
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class PageFamilyTests(TestCase):
+    FAMILIES = (
+        'index', 'trending', 'group:cats', 'group:dogs', 'profile:author',
+        'profile:other',
+    )
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.cats = Group.objects.create(title='Кошки', slug='cats')
+        Group.objects.create(title='Собаки', slug='dogs')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.cats, text='пост')
+        cls.other_post = Post.objects.create(author=cls.other, text='чужой')
+
+    def setUp(self):
+        cache.clear()
+
+    def families_changed_by(self, action):
+        """Семейства, версия которых сменилась после action()."""
+        families = self.FAMILIES + tuple(
+            f'post:{pk}' for pk in Post.objects.values_list('pk', flat=True))
+        before = {family: page_versions([family]) for family in families}
+        action()
+        return {
+            family for family in families
+            if page_versions([family]) != before[family]
+        }
+
+    def test_comment_resets_only_its_post(self):
+        changed = self.families_changed_by(lambda: Comment.objects.create(
+            post=self.post, author=self.other, text='комментарий'))
+        self.assertEqual(changed, {'trending', f'post:{self.post.pk}'})
+
+    def test_new_post_resets_its_pages(self):
+        """Новый пост меняет и счётчик на страницах постов автора."""
+        changed = self.families_changed_by(lambda: Post.objects.create(
+            author=self.author, group=self.cats, text='новый'))
+        self.assertEqual(changed, {
+            'index', 'trending', 'group:cats', 'profile:author',
+            f'post:{self.post.pk}',
+        })
+
+    def test_moved_post_resets_both_groups(self):
+        def move():
+            post = Post.objects.get(pk=self.post.pk)
+            post.group = Group.objects.get(slug='dogs')
+            post.save()
+
+        changed = self.families_changed_by(move)
+        self.assertEqual(changed, {
+            'index', 'trending', 'group:cats', 'group:dogs',
+            'profile:author', f'post:{self.post.pk}',
+        })
+
+    def test_rename_resets_everything(self):
+        def rename():
+            self.other.first_name = 'Иван'
+            self.other.save()
+
+        self.assertEqual(
+            len(self.families_changed_by(rename)), len(self.FAMILIES) + 2)
+        self.assertEqual(self.families_changed_by(
+            lambda: self.other.save(update_fields=['last_login'])), set())
+
+    def test_bumped_again_on_commit(self):
+        """Страница, закэшированная до COMMIT, сбрасывается после него."""
+        with mock.patch('core.cache.transaction.on_commit') as on_commit:
+            bump_page_version('index')
+        version = page_versions(['index'])
+        on_commit.call_args[0][0]()
+        self.assertNotEqual(page_versions(['index']), version)
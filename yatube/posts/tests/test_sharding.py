@@ -0,0 +1,150 @@
+import os
+import tempfile
+from collections import Counter
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.http import Http404
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Group, Post, User
+from ..sharding import (ShardRouter, ShardedFeed, get_post_or_404,
+                        shard_for_author)
+
+SHARDS = ['default', 'shard1', 'shard2']
+
+
+@override_settings(POST_SHARDS=SHARDS)
+class ShardingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.router = ShardRouter()
+        cls.user = User(pk=7, username='auth')
+
+    def test_shard_for_author_is_stable_and_even(self):
+        """Шард зависит только от автора, авторы распределены равномерно."""
+        self.assertEqual(shard_for_author(7), shard_for_author(7))
+        counts = Counter(shard_for_author(pk) for pk in range(3000))
+        self.assertEqual(set(counts), set(SHARDS))
+        for count in counts.values():
+            self.assertGreater(count, 900)
+
+    def test_posts_routed_by_author(self):
+        """Пост и выборка постов автора идут в шард автора."""
+        post = Post(author=self.user, text='текст')
+        shard = shard_for_author(self.user.pk)
+        self.assertEqual(self.router.db_for_write(Post, instance=post), shard)
+        self.assertEqual(
+            self.router.db_for_read(Post, instance=self.user), shard)
+
+    def test_comments_follow_post(self):
+        """Комментарий хранится в шарде поста, а не своего автора."""
+        post = Post(author=self.user, text='текст')
+        comment = Comment(post=post, author=User(pk=8), text='комментарий')
+        self.assertEqual(
+            self.router.db_for_write(Comment, instance=comment),
+            shard_for_author(self.user.pk),
+        )
+        self.assertIsNone(
+            self.router.db_for_read(Comment, instance=User(pk=8)))
+
+    def test_other_models_not_routed(self):
+        """Пользователи и группы остаются в основной базе."""
+        self.assertIsNone(self.router.db_for_read(User, instance=self.user))
+
+
+class ShardedFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            Post(text=f'Post {i}', author=user) for i in range(5))
+
+    @override_settings(POST_SHARDS=['default', 'default'])
+    def test_merge_keeps_pub_date_order(self):
+        """Слияние лент шардов сохраняет порядок -pub_date."""
+        feed = ShardedFeed(Post.objects.all())
+        self.assertEqual(feed.count(), 10)
+        posts = feed[2:6]
+        self.assertEqual(len(posts), 4)
+        keys = [(post.pub_date, post.pk) for post in posts]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_get_post_or_404(self):
+        """Отсутствующий во всех шардах пост даёт 404."""
+        with self.assertRaises(Http404):
+            get_post_or_404(Post.objects.all(), 10 ** 6)
+
+
+@override_settings(POST_SHARDS=['default', 'shard1'])
+class TwoShardTests(TestCase):
+    """Второй шард - настоящая база SQLite во временном файле."""
+
+    databases = {'default', 'shard1'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        connections.databases['shard1'] = {
+            **settings.DATABASES['default'],
+            'NAME': os.path.join(cls.directory.name, 'shard1.sqlite3'),
+        }
+        call_command('migrate', database='shard1', verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['shard1'].close()
+        del connections.databases['shard1']
+        del connections._connections.shard1
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        self.posts = []
+        # Авторы из разных шардов.
+        for pk in range(1, 40):
+            if {shard_for_author(pk)} <= {
+                    shard_for_author(post.author_id) for post in self.posts}:
+                continue
+            author = User.objects.create_user(pk=pk, username=f'user{pk}')
+            # Post.objects.create() без подсказки instance ушёл бы в default.
+            post = Post(author=author, group=self.group, text=f'пост {pk}')
+            post.save()
+            self.posts.append(post)
+
+    def test_posts_stored_in_author_shard(self):
+        self.assertEqual(len(self.posts), 2)
+        for post in self.posts:
+            self.assertEqual(post._state.db, shard_for_author(post.author_id))
+            self.assertTrue(
+                Post.objects.using(post._state.db).filter(pk=post.pk).exists())
+        self.assertEqual(Post.objects.using('default').count(), 1)
+
+    def test_feeds_merge_shards(self):
+        feed = ShardedFeed(Post.objects.select_related('author'))
+        self.assertEqual(feed.count(), 2)
+        self.assertEqual(feed[0:2], self.posts[::-1])
+        response = self.client.get(
+            reverse('posts:postsname', kwargs={'slug': 'group'}))
+        self.assertEqual(
+            list(response.context['page_obj']), self.posts[::-1])
+        for post in self.posts:
+            self.assertEqual(
+                get_post_or_404(Post.objects.all(), post.pk), post)
+
+    def test_admin_read_only(self):
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'secret-pass')
+        self.client.force_login(admin)
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'move_to_group')
+        response = self.client.get(reverse('admin:posts_post_add'))
+        self.assertEqual(response.status_code, 403)
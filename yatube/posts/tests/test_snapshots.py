@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Follow, Group, Post, User
+
+SNAPSHOT_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(SNAPSHOTS_ENABLED=True, SNAPSHOT_ROOT=SNAPSHOT_ROOT)
+class SnapshotTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(SNAPSHOT_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='описание')
+        self.other = Group.objects.create(
+            title='Другая', slug='other', description='описание')
+        self.post = Post.objects.create(
+            author=self.author, group=self.group, text='снимок страницы')
+
+    def snapshot(self, *parts):
+        path = os.path.join(SNAPSHOT_ROOT, *parts, 'index.html')
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as file:
+            return file.read()
+
+    def test_post_publishes_snapshots(self):
+        """Новый пост перерисовывает главную и страницу группы."""
+        self.assertIn('снимок страницы', self.snapshot())
+        self.assertIn('снимок страницы', self.snapshot('group', 'group'))
+
+    def test_anonymous_served_without_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = Client().get('/group/group/')
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(response['Content-Type'], 'text/html; charset=utf-8')
+        self.assertIn('снимок страницы',
+                      b''.join(response.streaming_content).decode())
+
+    def test_logged_in_gets_live_page(self):
+        client = Client()
+        client.force_login(self.author)
+        response = client.get('/group/group/')
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.context['user'], self.author)
+
+    def test_moved_post_leaves_old_group(self):
+        """Пост, перенесённый в другую группу, пропадает со старой."""
+        self.post.group = self.other
+        self.post.save()
+        self.assertNotIn('снимок страницы', self.snapshot('group', 'group'))
+        self.assertIn('снимок страницы', self.snapshot('group', 'other'))
+
+    def test_deleted_group_snapshot_removed(self):
+        self.other.delete()
+        self.assertIsNone(self.snapshot('group', 'other'))
+
+    def test_renamed_author_refreshes_feeds(self):
+        self.author.first_name = 'Новоеимя'
+        self.author.save()
+        self.assertIn('Новоеимя', self.snapshot('group', 'group'))
+        self.assertIn('Новоеимя', self.snapshot())
+
+    @override_settings(SNAPSHOT_PROFILE_FOLLOWERS=1)
+    def test_profile_follows_follower_threshold(self):
+        reader = User.objects.create_user(username='reader')
+        self.assertIsNone(self.snapshot('profile', 'author'))
+        follow = Follow.objects.create(user=reader, author=self.author)
+        self.assertIn('снимок страницы', self.snapshot('profile', 'author'))
+        follow.delete()
+        self.assertIsNone(self.snapshot('profile', 'author'))
@@ -0,0 +1,82 @@
+import math
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import trending
+from ..models import Comment, Post, PostScore, User
+
+
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.old = Post.objects.create(author=cls.author, text='старый')
+        cls.new = Post.objects.create(author=cls.author, text='новый')
+
+    def comment(self, post, hours_ago=0):
+        comment = Comment.objects.create(
+            post=post, author=self.author, text='комментарий')
+        if hours_ago:
+            moment = timezone.now() - timedelta(hours=hours_ago)
+            Comment.objects.filter(pk=comment.pk).update(created=moment)
+            # Оценка учитывает время комментария, как при его создании.
+            PostScore.objects.all().delete()
+            trending.rebuild()
+
+    def test_recent_activity_wins(self):
+        """Три комментария сутки назад весят меньше двух свежих."""
+        for _ in range(3):
+            self.comment(self.old, hours_ago=24)
+        self.comment(self.new)
+        self.comment(self.new)
+        self.assertEqual(trending.top_posts(), [self.new, self.old])
+
+    def test_incremental_matches_rebuild(self):
+        for post in (self.old, self.new, self.new):
+            self.comment(post)
+        incremental = dict(PostScore.objects.values_list('post_id', 'score'))
+        trending.rebuild()
+        rebuilt = dict(PostScore.objects.values_list('post_id', 'score'))
+        self.assertEqual(incremental.keys(), rebuilt.keys())
+        for post_id, score in rebuilt.items():
+            self.assertAlmostEqual(incremental[post_id], score)
+
+    def test_locked_update_after_failed_attempts(self):
+        """Без удачных попыток сравнения событие не теряется."""
+        moment = timezone.now()
+        with self.assertLogs('yatube.trending', 'WARNING'):
+            trending.add_activity(self.new.pk, self.author.pk, moment, 0)
+            trending.add_activity(self.new.pk, self.author.pk, moment, 0)
+        score = PostScore.objects.get(post_id=self.new.pk).score
+        self.assertAlmostEqual(
+            score, trending.point(moment) + math.log(2))
+
+    def test_decay_removes_stale_posts(self):
+        self.comment(self.old, hours_ago=24 * 7)
+        self.comment(self.new)
+        call_command('decay_trending', stdout=StringIO())
+        self.assertEqual(
+            list(PostScore.objects.values_list('post_id', flat=True)),
+            [self.new.pk])
+
+    def test_page_reads_score_table(self):
+        self.comment(self.old)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('posts:trending'))
+        self.assertEqual(list(response.context['page_obj']), [self.old])
+        for query in queries:
+            self.assertNotIn('posts_comment', query['sql'])
+
+    def test_deleted_post_dropped(self):
+        post = Post.objects.create(author=self.author, text='удалённый')
+        self.comment(post)
+        post.delete()
+        self.assertFalse(PostScore.objects.exists())
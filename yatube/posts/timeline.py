@@ -0,0 +1,142 @@
+import heapq
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Follow, Post, TimelineEntry
+from .sharding import post_feed, shard_for_author, sharding_enabled
+
+
+def is_popular(author_id):
+    """У популярных авторов лента собирается при чтении (fan-out on read)."""
+    followers = Follow.objects.filter(author_id=author_id).count()
+    return followers >= settings.TIMELINE_FANOUT_LIMIT
+
+
+def fan_out_post(post):
+    """Раскладывает новый пост в ленты подписчиков автора.
+
+    Пост популярного автора помечается fanned_out=False и навсегда
+    остаётся в ленте чтения, даже если подписчиков станет меньше.
+    """
+    if is_popular(post.author_id):
+        Post.objects.using(post._state.db).filter(pk=post.pk).update(
+            fanned_out=False)
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True)
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(
+                user_id=user_id,
+                author_id=post.author_id,
+                post_id=post.pk,
+                pub_date=post.pub_date,
+            )
+            for user_id in followers
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def backfill(user, author):
+    """Добавляет в ленту подписчика последние посты нового автора.
+
+    Задача выполняется позже подписки: если подписчик уже отписался,
+    записи не добавляются. Подписка проверяется в той же транзакции, а
+    select_for_update задерживает параллельную отписку до COMMIT.
+    """
+    posts = list(author.posts.filter(fanned_out=True).values_list(
+        'pk', 'pub_date')[:settings.TIMELINE_BACKFILL])
+    with transaction.atomic():
+        following = Follow.objects.select_for_update().filter(
+            user=user, author=author)
+        if not following.exists():
+            return
+        TimelineEntry.objects.bulk_create(
+            [
+                TimelineEntry(
+                    user=user, author=author, post_id=pk, pub_date=pub_date)
+                for pk, pub_date in posts
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def forget_author(user, author):
+    TimelineEntry.objects.filter(user=user, author=author).delete()
+
+
+def fetch_posts(entries):
+    """Загружает посты записей ленты, по одному запросу на шард."""
+    by_shard = defaultdict(list)
+    for entry in entries:
+        shard = None
+        if sharding_enabled():
+            shard = shard_for_author(entry.author_id)
+        by_shard[shard].append(entry.post_id)
+    posts = {}
+    for shard, ids in by_shard.items():
+        posts.update(
+            Post.objects.using(shard).select_related('author', 'group')
+            .defer('text', 'text_html').in_bulk(ids)
+        )
+    return posts
+
+
+class FollowFeed:
+    """Лента подписок для Paginator.
+
+    Разложенные посты читаются одним диапазонным сканом по индексу
+    (user, -pub_date) таблицы TimelineEntry. Посты, опубликованные
+    популярными авторами (fanned_out=False), подмешиваются при чтении по
+    частичному индексу post_pulled_pub_date. Пост попадает ровно в
+    одну из двух частей, поэтому count() - их сумма.
+    """
+
+    ordered = True
+
+    def __init__(self, user):
+        self.entries = TimelineEntry.objects.filter(user=user)
+        followed = Follow.objects.filter(user=user).values_list(
+            'author', flat=True)
+        if sharding_enabled():
+            # Подписки лежат в основной базе, подзапрос в шард не попадёт.
+            followed = list(followed)
+        self.pulled = post_feed(
+            Post.objects.filter(author__in=followed, fanned_out=False)
+            .select_related('author', 'group')
+            .defer('text', 'text_html')
+            .order_by('-pub_date')
+        )
+
+    def count(self):
+        return self.entries.count() + self.pulled.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if isinstance(item, int):
+            return self[item:item + 1][0]
+        start, stop = item.start or 0, item.stop
+        merged = heapq.merge(
+            ((entry.pub_date, entry.post_id, entry)
+             for entry in self.entries[:stop]),
+            ((post.pub_date, post.pk, post) for post in self.pulled[:stop]),
+            key=lambda row: row[:2],
+            reverse=True,
+        )
+        page = [row[2] for row in islice(merged, start, stop)]
+        posts = fetch_posts(
+            [row for row in page if isinstance(row, TimelineEntry)])
+        result = []
+        for row in page:
+            if isinstance(row, TimelineEntry):
+                # Пост мог быть удалён после раскладки.
+                row = posts.get(row.post_id)
+            if row is not None:
+                result.append(row)
+        return result
@@ -0,0 +1,124 @@
+import logging
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Comment, PostScore
+from .sharding import sharding_enabled
+from .timeline import fetch_posts
+
+logger = logging.getLogger('yatube.trending')
+
+# Точка отсчёта времени в оценках; оценки растут на 1 за tau секунд.
+EPOCH = datetime(2021, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def tau():
+    return settings.TRENDING_HALF_LIFE / math.log(2)
+
+
+def point(moment):
+    """Логарифм веса события в момент moment."""
+    return (moment - EPOCH).total_seconds() / tau()
+
+
+def logaddexp(a, b):
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def add_activity(post_id, author_id, moment, attempts=5):
+    """Прибавляет к оценке поста событие в момент moment.
+
+    Обновление - сравнение с записью старого значения: параллельный
+    комментарий к тому же посту не затрётся, а повторит попытку. Если
+    попытки кончились, оценка обновляется под блокировкой строки.
+    """
+    value = point(moment)
+    rows = PostScore.objects.filter(post_id=post_id)
+    for _ in range(attempts):
+        old = rows.values_list('score', flat=True).first()
+        if old is None:
+            try:
+                with transaction.atomic():
+                    PostScore.objects.create(
+                        post_id=post_id, author_id=author_id, score=value)
+                return
+            except IntegrityError:
+                continue
+        if rows.filter(score=old).update(score=logaddexp(old, value)):
+            return
+    logger.warning(
+        'Оценка поста %s не обновилась за %s попыток, блокируем строку',
+        post_id, attempts,
+    )
+    try:
+        with transaction.atomic():
+            old = rows.select_for_update().values_list(
+                'score', flat=True).first()
+            if old is None:
+                PostScore.objects.create(
+                    post_id=post_id, author_id=author_id, score=value)
+            else:
+                rows.update(score=logaddexp(old, value))
+    except IntegrityError:
+        logger.error('Событие не учтено в оценке поста %s', post_id)
+
+
+def threshold(now=None):
+    """Оценка, ниже которой вес поста сейчас меньше TRENDING_MIN_WEIGHT."""
+    return point(now or timezone.now()) + math.log(
+        settings.TRENDING_MIN_WEIGHT)
+
+
+def decay(now=None):
+    """Удаляет посты, активность которых затухла. Порядок остальных от
+    времени не зависит, поэтому их оценки не пересчитываются."""
+    return PostScore.objects.filter(score__lt=threshold(now)).delete()[0]
+
+
+def rebuild(now=None):
+    """Пересчитывает оценки по комментариям, которые ещё имеют вес."""
+    now = now or timezone.now()
+    window = tau() * -math.log(settings.TRENDING_MIN_WEIGHT)
+    since = now - timedelta(seconds=window)
+    scores, authors = {}, {}
+    aliases = settings.POST_SHARDS if sharding_enabled() else [None]
+    for alias in aliases:
+        comments = Comment.objects.using(alias).filter(
+            created__gte=since, post__isnull=False,
+        ).values_list('post_id', 'post__author_id', 'created')
+        for post_id, author_id, created in comments.iterator():
+            value = point(created)
+            old = scores.get(post_id)
+            scores[post_id] = value if old is None else logaddexp(old, value)
+            authors[post_id] = author_id
+    with transaction.atomic():
+        PostScore.objects.all().delete()
+        PostScore.objects.bulk_create(
+            PostScore(post_id=pk, author_id=authors[pk], score=score)
+            for pk, score in scores.items()
+        )
+    return len(scores)
+
+
+def top_posts(limit=None):
+    """Популярные посты: top-N по индексу оценки, по запросу на шард."""
+    limit = limit or settings.TRENDING_SIZE
+    scores = list(
+        PostScore.objects.filter(score__gte=threshold())[:limit])
+    posts = fetch_posts(scores)
+    return [posts[row.post_id] for row in scores if row.post_id in posts]
+
+
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.post_id is not None:
+        add_activity(
+            instance.post_id, instance.post.author_id, instance.created)
+
+
+def post_deleted(sender, instance, **kwargs):
+    PostScore.objects.filter(post_id=instance.pk).delete()
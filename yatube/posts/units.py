@@ -1,6 +1,7 @@
 from django.core.paginator import Paginator
 
 MESSAGE_N = 10
+EXCERPT_LENGTH = 300
 
 
 def paginator_posts(post_list, post_on_page, request):
@@ -8,3 +9,14 @@ def paginator_posts(post_list, post_on_page, request):
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
     return page_obj
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    """Начало текста для ленты, обрезанное по границе слова."""
+    if len(text) <= length:
+        return text
+    words = text[:length].rsplit(maxsplit=1)
+    if not words:
+        # Начало текста - одни пробелы: жёсткий обрез без них.
+        return text.lstrip()[:length].rstrip() + '…'
+    return words[0].rstrip() + '…'
@@ -3,6 +3,20 @@ from . import views
 
 app_name = 'posts'
 
+
+def archive_paths(prefix, view, name):
+    """Архив целиком, за год, месяц и день."""
+    return [
+        path(prefix + suffix, view, name=name)
+        for suffix in (
+            'archive/',
+            'archive/<int:year>/',
+            'archive/<int:year>/<int:month>/',
+            'archive/<int:year>/<int:month>/<int:day>/',
+        )
+    ]
+
+
 urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='postsname'),
@@ -12,4 +26,15 @@ urlpatterns = [
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('posts/<int:post_id>/comment/',
          views.add_comment, name='add_comment'),
+    path('follow/', views.follow_index, name='follow_index'),
+    path('trending/', views.trending_posts, name='trending'),
+    path('fragments/', views.fragments, name='fragments'),
+    path('profile/<str:username>/follow/',
+         views.profile_follow, name='profile_follow'),
+    path('profile/<str:username>/unfollow/',
+         views.profile_unfollow, name='profile_unfollow'),
+    *archive_paths('', views.post_archive, 'archive'),
+    *archive_paths('group/<slug:slug>/', views.group_archive, 'group_archive'),
+    *archive_paths(
+        'profile/<str:username>/', views.profile_archive, 'profile_archive'),
 ]
@@ -1,58 +1,219 @@
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Post, Group, User, Comment
+from django.template.loader import render_to_string
+from django.urls import reverse
+from .models import Post, Group, User, Follow
 from .forms import PostForm, CommentForm
 from django.contrib.auth.decorators import login_required
 from .units import paginator_posts, MESSAGE_N
-from django.views.decorators.cache import cache_page
+from .sharding import get_post_or_404, post_feed
+from .timeline import FollowFeed, forget_author
+from . import archive, tasks, trending
+from core.cache import versioned_cache_page
+from core.querycache import cached
+from core.ratelimit import ratelimit
+from core.tasks import enqueue_on_commit
+from django.views.decorators.cache import never_cache
 
+# Страницы ленты не зависят от пользователя и кэшируются одной копией на
+# всех; личные части подгружает fragments.
 
-@cache_page(60 * 20)
+
+@versioned_cache_page(60 * 20, 'index')
 def index(request):
     template = 'posts/index.html'
-    post_list = Post.objects.all().order_by('-pub_date')
+    post_list = post_feed(
+        Post.objects.defer('text', 'text_html').order_by('-pub_date'))
     context = {
         'page_obj': paginator_posts(post_list, MESSAGE_N, request),
         'post_list': post_list,
+        'shell': True,
     }
     return render(request, template, context)
 
 
+@versioned_cache_page(60 * 20, 'group:{slug}')
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
+    group = get_object_or_404(Group.objects.cached(), slug=slug)
     template = 'posts/group_list.html'
-    post_list = Post.objects.filter(group=group).order_by('-pub_date')
+    post_list = post_feed(
+        Post.objects.filter(group=group).defer('text', 'text_html')
+        .order_by('-pub_date')
+    )
     context = {
         'group': group,
-        'page_obj': paginator_posts(post_list, MESSAGE_N, request)
+        'page_obj': paginator_posts(post_list, MESSAGE_N, request),
+        'shell': True,
     }
     return render(request, template, context)
 
 
+@versioned_cache_page(60 * 20, 'profile:{username}')
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    user_post_list = author.posts.select_related('author').order_by(
-        '-pub_date')
+    author = get_object_or_404(cached(User.objects.all()), username=username)
+    user_post_list = author.posts.select_related('author').defer(
+        'text', 'text_html').order_by('-pub_date')
     context = {
         'page_obj': paginator_posts(user_post_list, MESSAGE_N, request),
-        'author': author
-
+        'author': author,
+        'shell': True,
     }
     return render(request, 'posts/profile.html', context)
 
 
+@versioned_cache_page(60 * 5, 'trending')
+def trending_posts(request):
+    context = {
+        'page_obj': paginator_posts(
+            trending.top_posts(), MESSAGE_N, request),
+        'shell': True,
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+def archive_nav(scope, url_name, url_kwargs):
+    """Годы и месяцы с постами из таблицы счётчиков (posts.archive)."""
+    years = {}
+    for month, count in archive.months(scope):
+        year = years.setdefault(month.year, {
+            'year': month.year,
+            'url': reverse(
+                url_name, kwargs={**url_kwargs, 'year': month.year}),
+            'months': [],
+        })
+        year['months'].append({
+            'month': month,
+            'count': count,
+            'url': reverse(url_name, kwargs={
+                **url_kwargs, 'year': month.year, 'month': month.month}),
+        })
+    return list(years.values())
+
+
+def archive_page(request, post_list, scope, context, year, month, day):
+    """Посты за год, месяц или день; без года - только навигация."""
+    url_name = context.pop('url_name')
+    context.update({
+        'nav': archive_nav(scope, url_name, context.pop('url_kwargs')),
+        'year': year,
+        'month': month,
+        'day': day,
+        'shell': True,
+    })
+    if year is not None:
+        try:
+            start, end = archive.period(year, month, day)
+        except (ValueError, OverflowError):
+            raise Http404('Нет такой даты')
+        post_list = (
+            post_list.select_related('author').defer('text', 'text_html')
+            .filter(pub_date__gte=start, pub_date__lt=end)
+        )
+        # Счётчики только для навигации: COUNT за период идёт по индексам
+        # (scope, -pub_date) и не зависит от расхождения счётчиков.
+        context['page_obj'] = paginator_posts(
+            post_feed(post_list), MESSAGE_N, request)
+        context['period_start'] = start
+    return render(request, 'posts/archive.html', context)
+
+
+@versioned_cache_page(60 * 20, 'index')
+def post_archive(request, year=None, month=None, day=None):
+    context = {
+        'title': 'Архив записей',
+        'url_name': 'posts:archive',
+        'url_kwargs': {},
+    }
+    return archive_page(
+        request, Post.objects.order_by('-pub_date'), archive.ALL, context,
+        year, month, day,
+    )
+
+
+@versioned_cache_page(60 * 20, 'group:{slug}')
+def group_archive(request, slug, year=None, month=None, day=None):
+    group = get_object_or_404(Group.objects.cached(), slug=slug)
+    context = {
+        'title': f'Архив сообщества {group.title}',
+        'url_name': 'posts:group_archive',
+        'url_kwargs': {'slug': slug},
+    }
+    return archive_page(
+        request, Post.objects.filter(group=group).order_by('-pub_date'),
+        archive.group_scope(group.pk), context, year, month, day,
+    )
+
+
+@versioned_cache_page(60 * 20, 'profile:{username}')
+def profile_archive(request, username, year=None, month=None, day=None):
+    author = get_object_or_404(cached(User.objects.all()), username=username)
+    context = {
+        'title': f'Архив пользователя {author.get_full_name()}',
+        'url_name': 'posts:profile_archive',
+        'url_kwargs': {'username': username},
+    }
+    return archive_page(
+        request, author.posts.order_by('-pub_date'),
+        archive.author_scope(author.pk), context, year, month, day,
+    )
+
+
+@versioned_cache_page(60 * 20, 'post:{post_id}')
 def post_detail(request, post_id, ):
-    post = get_object_or_404(Post, pk=post_id)
-    comments = Comment.objects.filter(post=post)
-    form = CommentForm(request.POST or None)
+    post = get_post_or_404(Post.objects.cached(), post_id)
+    comments = post.comments.all()
     context = {
         'post': post,
         'comments': comments,
-        'form': form,
+        'shell': True,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@never_cache
+def fragments(request):
+    """Части страницы, зависящие от пользователя (static/js/fragments.js).
+
+    Автор поста приходит из страницы и влияет только на показ ссылки
+    редактирования: права проверяет post_edit.
+    """
+    user = request.user
+    author = request.GET.get('author', '')
+    post_id = request.GET.get('post', '')
+    parts = {
+        'header': render_to_string(
+            'includes/header_user.html', request=request),
+    }
+    if post_id.isdigit():
+        parts['post_actions'] = render_to_string(
+            'includes/post_actions.html',
+            {
+                'post_id': post_id,
+                'is_author': user.is_authenticated and user.username == author,
+            },
+            request,
+        )
+        parts['comment_form'] = render_to_string(
+            'includes/comment_form.html',
+            {'post_id': post_id, 'form': CommentForm()},
+            request,
+        )
+    elif author:
+        following = (
+            user.is_authenticated
+            and Follow.objects.filter(
+                user=user, author__username=author).exists()
+        )
+        parts['follow'] = render_to_string(
+            'includes/follow_button.html',
+            {'author': author, 'following': following},
+            request,
+        )
+    return JsonResponse(parts)
+
+
 @login_required
+@ratelimit('5/m')
 def post_create(request, post=None):
     if request.method == "POST":
         form = PostForm(request.POST)
@@ -60,6 +221,10 @@ def post_create(request, post=None):
             post = form.save(commit=False)
             post.author = request.user
             post.save()
+            enqueue_on_commit(tasks.fan_out, post.pk, post.author_id)
+            if post.image:
+                enqueue_on_commit(
+                    tasks.make_thumbnails, post.pk, post.author_id)
             return redirect('posts:profile', post.author)
         return render(request, 'posts/create_post.html', {'form': form})
     form = PostForm(
@@ -71,8 +236,9 @@ def post_create(request, post=None):
 
 
 @login_required
+@ratelimit('10/m')
 def post_edit(request, post_id):
-    post = Post.objects.get(pk=post_id)
+    post = get_post_or_404(Post.objects.all(), post_id)
     if request.user != post.author:
         return redirect('posts:post_detail', post_id=post_id)
     form = PostForm(
@@ -80,19 +246,65 @@ def post_edit(request, post_id):
         instance=post,
         files=request.FILES or None)
     if form.is_valid():
-        form.save()
+        post = form.save()
+        if 'image' in form.changed_data and post.image:
+            enqueue_on_commit(tasks.make_thumbnails, post.pk, post.author_id)
         return redirect('posts:post_detail', post_id, )
     return render(request, 'posts/create_post.html',
                   {'form': form, 'is_edit': True}, )
 
 
 @login_required
+@ratelimit('10/m')
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_post_or_404(Post.objects.cached(), post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
         comment.save()
-    return redirect('posts:post_detail', post_id=post_id)
+    if not request.is_ajax():
+        return redirect('posts:post_detail', post_id=post_id)
+    # static/js/comments.js: только новый комментарий или форма с ошибками.
+    if form.is_valid():
+        html = render_to_string(
+            'includes/comment.html', {'comment': comment}, request)
+        return JsonResponse({'comment': html}, status=201)
+    html = render_to_string(
+        'includes/comment_form.html',
+        {'post_id': post.pk, 'form': form},
+        request,
+    )
+    return JsonResponse({'form': html}, status=400)
+
+
+@login_required
+def follow_index(request):
+    context = {
+        'page_obj': paginator_posts(
+            FollowFeed(request.user), MESSAGE_N, request),
+    }
+    return render(request, 'posts/follow.html', context)
+
+
+@login_required
+@ratelimit('30/m', methods=('GET', 'POST'))
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        _, created = Follow.objects.get_or_create(
+            user=request.user, author=author)
+        if created:
+            enqueue_on_commit(
+                tasks.backfill_timeline, request.user.pk, author.pk)
+    return redirect('posts:profile', username=username)
+
+
+@login_required
+@ratelimit('30/m', methods=('GET', 'POST'))
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    Follow.objects.filter(user=request.user, author=author).delete()
+    forget_author(request.user, author)
+    return redirect('posts:profile', username=username)
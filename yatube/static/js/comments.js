@@ -0,0 +1,40 @@
+// Комментарий отправляется без перезагрузки страницы: сервер возвращает
+// только новый комментарий или форму с ошибками (posts.views.add_comment).
+(function () {
+  document.addEventListener('submit', function (event) {
+    var form = event.target;
+    var list = document.querySelector('[data-comments]');
+    if (!form.hasAttribute('data-comment-form') || !list || !window.fetch) {
+      return;
+    }
+    event.preventDefault();
+    var button = form.querySelector('[type=submit]');
+    button.disabled = true;
+    fetch(form.action, {
+      method: 'POST',
+      body: new FormData(form),
+      credentials: 'same-origin',
+      headers: {'X-Requested-With': 'XMLHttpRequest'},
+    })
+      .then(function (response) {
+        var json = response.headers.get('Content-Type') === 'application/json';
+        if (!json || (response.status !== 201 && response.status !== 400)) {
+          throw new Error(response.status);
+        }
+        return response.json();
+      })
+      .then(function (data) {
+        if (data.comment) {
+          list.insertAdjacentHTML('beforeend', data.comment);
+          form.reset();
+        } else {
+          form.closest('[data-fragment]').innerHTML = data.form;
+        }
+        button.disabled = false;
+      })
+      .catch(function () {
+        // Обычная отправка формы, например для перехода на страницу входа.
+        form.submit();
+      });
+  });
+})();
@@ -0,0 +1,32 @@
+// Страницы ленты кэшируются одной копией для всех пользователей, а
+// зависящие от пользователя части (шапка, ссылка на редактирование,
+// форма комментария, кнопка подписки) приходят отдельным запросом.
+(function () {
+  var source = document.querySelector('[data-fragments-url]');
+  if (!source) {
+    return;
+  }
+  var placeholders = document.querySelectorAll('[data-fragment]');
+  var params = new URLSearchParams();
+  placeholders.forEach(function (element) {
+    ['post', 'author'].forEach(function (name) {
+      if (element.dataset[name]) {
+        params.set(name, element.dataset[name]);
+      }
+    });
+  });
+  fetch(source.dataset.fragmentsUrl + '?' + params, {
+    credentials: 'same-origin',
+  })
+    .then(function (response) {
+      return response.ok ? response.json() : {};
+    })
+    .then(function (fragments) {
+      placeholders.forEach(function (element) {
+        var html = fragments[element.dataset.fragment];
+        if (html !== undefined) {
+          element.innerHTML = html;
+        }
+      });
+    });
+})();
@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
 
 
 class UsersConfig(AppConfig):
     name = 'users'
+
+    def ready(self):
+        from .signals import forget_user
+
+        for signal in (post_save, post_delete):
+            signal.connect(forget_user, sender=get_user_model())
+        user_logged_out.connect(forget_user)
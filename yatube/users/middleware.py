@@ -0,0 +1,101 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import get_user_model
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+from core.querycache import bulk_key, versions
+
+USER_CACHE_TIMEOUT = 300
+
+# Поля, которые нужны шаблонам и проверкам прав. Пароль в кэш не
+# попадает: остальные поля модель дочитает из базы при обращении.
+CACHED_FIELDS = (
+    'id', 'username', 'first_name', 'last_name',
+    'is_active', 'is_staff', 'is_superuser',
+)
+
+
+def user_cache_key(user_id):
+    return f'user:{user_id}'
+
+
+def users_epoch_key():
+    """Эпоха таблицы пользователей: меняется при update() без сигналов
+    (users.signals.update_users)."""
+    return bulk_key(get_user_model()._meta.db_table)
+
+
+def to_cache(user, epoch):
+    return {
+        'fields': {name: getattr(user, name) for name in CACHED_FIELDS},
+        'db': user._state.db,
+        'auth_hash': user.get_session_auth_hash(),
+        'epoch': epoch,
+    }
+
+
+def from_cache(entry):
+    """Пользователь с отложенными полями, не попавшими в кэш."""
+    model = get_user_model()
+    # from_db ждёт значения в порядке полей модели.
+    names = [
+        field.attname for field in model._meta.concrete_fields
+        if field.attname in entry['fields']
+    ]
+    return model.from_db(
+        entry['db'], names, [entry['fields'][name] for name in names])
+
+
+def load_user(user_id, backend):
+    """Пользователь и хэш для сессии: из кэша, при промахе - бэкендом.
+
+    Версия эпохи читается до запроса к базе: update(), прошедший во
+    время чтения, не оставит старую запись в кэше.
+    """
+    key, epoch_key = user_cache_key(user_id), users_epoch_key()
+    cached = cache.get_many([key, epoch_key])
+    entry = cached.get(key)
+    if entry is not None and entry['epoch'] == cached.get(epoch_key):
+        return from_cache(entry), entry['auth_hash']
+    epoch = versions([epoch_key])[epoch_key]
+    user = backend.get_user(user_id)
+    if user is None:
+        return None, None
+    cache.set(key, to_cache(user, epoch), getattr(
+        settings, 'USER_CACHE_TIMEOUT', USER_CACHE_TIMEOUT))
+    return user, user.get_session_auth_hash()
+
+
+def get_user(request):
+    """Аналог django.contrib.auth.get_user с кэшем пользователя.
+
+    Хэш сессии сверяется с закэшированным хэшем пароля: смена пароля
+    сохраняет пользователя и сбрасывает кэш (ещё раз после COMMIT), так
+    что старые сессии по-прежнему становятся недействительными.
+    """
+    try:
+        user_id = auth._get_user_session_key(request)
+        backend_path = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+    user, auth_hash = load_user(user_id, auth.load_backend(backend_path))
+    if user is None:
+        return AnonymousUser()
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if not (session_hash and constant_time_compare(session_hash, auth_hash)):
+        request.session.flush()
+        return AnonymousUser()
+    return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """Замена AuthenticationMiddleware без запроса к auth_user."""
+
+    def process_request(self, request):
+        request.user = SimpleLazyObject(lambda: get_user(request))
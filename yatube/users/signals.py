@@ -0,0 +1,27 @@
+from django.core.cache import cache
+from django.db import transaction
+
+from core.querycache import bump
+from .middleware import user_cache_key, users_epoch_key
+
+
+def forget_user(sender, instance=None, user=None, using=None, **kwargs):
+    """Сбрасывает кэш пользователя при сохранении, удалении и выходе."""
+    user = instance or user
+    if user is None or user.pk is None:
+        return
+    key = user_cache_key(user.pk)
+    cache.delete(key)
+    # Повторно после фиксации: запрос, прочитавший строку до COMMIT, мог
+    # снова положить в кэш старый хэш пароля или is_active.
+    transaction.on_commit(lambda: cache.delete(key), using=using)
+
+
+def update_users(queryset, **fields):
+    """QuerySet.update() пользователей (например, is_active=False) со
+    сбросом их кэша: update() не отправляет сигналов."""
+    rows = queryset.update(**fields)
+    bump(users_epoch_key())
+    transaction.on_commit(
+        lambda: bump(users_epoch_key()), using=queryset.db)
+    return rows
@@ -0,0 +1,92 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..middleware import user_cache_key
+from ..signals import update_users
+
+User = get_user_model()
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+})
+class CachedUserTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='reader', password='old-pass-123')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.context['user'], self.user)
+        return [q for q in queries if 'auth_user' in q['sql']]
+
+    def test_user_read_from_cache(self):
+        """Повторный запрос не читает auth_user."""
+        url = reverse('about:author')
+        self.assertEqual(len(self.user_queries(url)), 1)
+        self.assertEqual(self.user_queries(url), [])
+
+    def test_save_invalidates_cache(self):
+        """Сохранение пользователя сбрасывает кэш."""
+        self.client.get(reverse('about:author'))
+        self.user.first_name = 'Новое имя'
+        self.user.save()
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+        response = self.client.get(reverse('about:author'))
+        self.assertEqual(response.context['user'].first_name, 'Новое имя')
+
+    def test_password_change_logs_out_other_sessions(self):
+        """После смены пароля старые сессии недействительны."""
+        other = Client()
+        other.force_login(self.user)
+        other.get(reverse('about:author'))
+        self.client.post(reverse('users:password_change'), {
+            'old_password': 'old-pass-123',
+            'new_password1': 'new-pass-456',
+            'new_password2': 'new-pass-456',
+        })
+        response = other.get(reverse('about:author'))
+        self.assertFalse(response.context['user'].is_authenticated)
+        response = self.client.get(reverse('about:author'))
+        self.assertTrue(response.context['user'].is_authenticated)
+
+    def test_logout_clears_cache(self):
+        self.client.get(reverse('about:author'))
+        self.client.get(reverse('users:logout'))
+        self.assertIsNone(cache.get(user_cache_key(self.user.pk)))
+
+    def test_cache_holds_no_password(self):
+        self.client.get(reverse('about:author'))
+        entry = cache.get(user_cache_key(self.user.pk))
+        self.assertNotIn('password', entry['fields'])
+        self.assertNotIn(self.user.password, repr(entry))
+
+    def test_cache_dropped_again_after_commit(self):
+        """Старая строка, закэшированная до COMMIT, не переживёт его."""
+        key = user_cache_key(self.user.pk)
+        with mock.patch('users.signals.transaction.on_commit') as on_commit:
+            self.user.save()
+        cache.set(key, 'прочитано до COMMIT')
+        for call in on_commit.call_args_list:
+            call[0][0]()
+        self.assertIsNone(cache.get(key))
+
+    def test_deactivation_by_update_logs_out(self):
+        self.client.get(reverse('about:author'))
+        update_users(User.objects.filter(pk=self.user.pk), is_active=False)
+        response = self.client.get(reverse('about:author'))
+        self.assertFalse(response.context['user'].is_authenticated)
@@ -48,11 +48,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MemoryProfileMiddleware',
+    'core.middleware.SlowQueryLogMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.SnapshotMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.CachedAuthenticationMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -88,6 +94,42 @@ DATABASES = {
     }
 }
 
+# Read replicas: comma-separated SQLite file names, refreshed from the
+# primary database with `manage.py refresh_replicas`.
+DATABASE_REPLICAS = []
+for index, name in enumerate(
+    filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), start=1
+):
+    DATABASES[f'replica{index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, name),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{index}')
+
+# Optional sharding of posts and comments by author: comma-separated SQLite
+# file names of additional shards, `default` is always the first shard.
+POST_SHARDS = ['default']
+for index, name in enumerate(
+    filter(None, os.getenv('POST_SHARDS', '').split(',')), start=1
+):
+    DATABASES[f'shard{index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, name),
+    }
+    POST_SHARDS.append(f'shard{index}')
+
+DATABASE_ROUTERS = [
+    'posts.sharding.ShardRouter',
+    'core.routers.ReplicaRouter',
+]
+REPLICA_ROUTED_APPS = ['posts']
+REPLICA_PIN_COOKIE = 'pin_primary'
+REPLICA_PIN_SECONDS = 30
+
+# Every new SQLite connection is configured by core.sqlite.apply_pragmas
+# with core.sqlite.SQLITE_PRAGMAS; define SQLITE_PRAGMAS here to override.
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -124,6 +166,9 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+# Serve STATIC_ROOT from the app (core.middleware.StaticFilesMiddleware)
+# when there is no front server; runserver serves static files itself.
+SERVE_STATIC = False
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -137,9 +182,129 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Serve MEDIA_URL with core.views.media when DEBUG is off. The file is
+# handed to the front server when MEDIA_SENDFILE is 'x-accel-redirect'
+# (nginx, internal location at MEDIA_ACCEL_REDIRECT_PREFIX) or
+# 'x-sendfile' (Apache, lighttpd); otherwise the app streams it.
+SERVE_MEDIA = False
+MEDIA_SENDFILE = ''
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+# Uploaded files are never overwritten under the same name.
+MEDIA_CACHE_CONTROL = 'public, max-age=31536000'
 
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+
+# Static HTML snapshots of the first pages of the index, groups and
+# profiles with at least SNAPSHOT_PROFILE_FOLLOWERS followers, served to
+# anonymous readers. Pages are re-rendered SNAPSHOT_DELAY seconds after
+# a write, so a burst of writes costs one render.
+SNAPSHOTS_ENABLED = False
+SNAPSHOT_ROOT = os.path.join(BASE_DIR, 'snapshots')
+SNAPSHOT_DELAY = 5
+SNAPSHOT_PROFILE_FOLLOWERS = 100
+
+# Responses shorter than this are sent uncompressed. Compressed bodies of
+# cacheable responses are kept in CACHES for COMPRESSION_CACHE_TIMEOUT.
+COMPRESSION_MIN_SIZE = 200
+COMPRESSION_CACHE_TIMEOUT = 600
+
+# Logged-in users are read from the cache instead of auth_user; the entry
+# is dropped on save, password change and logout.
+USER_CACHE_TIMEOUT = 300
+
+# Personal feed: posts of authors with fewer followers than the limit are
+# copied into followers' timelines on write, the rest are read on demand.
+TIMELINE_FANOUT_LIMIT = 1000
+TIMELINE_BACKFILL = 100
+
+# Trending posts: weight of a comment halves every TRENDING_HALF_LIFE
+# seconds. Posts whose activity decayed below TRENDING_MIN_WEIGHT
+# comments are dropped by `manage.py decay_trending`. Changing the half
+# life requires `decay_trending --rebuild`.
+TRENDING_HALF_LIFE = 6 * 3600
+TRENDING_MIN_WEIGHT = 0.05
+TRENDING_SIZE = 50
+
+# Session storage: `db` (default), `cached_db` (reads served from CACHES,
+# writes go through to the database), `cache` or `signed_cookies`
+# (no server-side storage; keep sessions small).
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_MODE = os.getenv('SESSION_MODE', 'db')
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+
+# Write views are rate limited with counters in CACHES
+# (core.ratelimit); the limits are set per view in the decorator. Caches
+# without an atomic incr (file-based, database) lose concurrent
+# increments, so with them the counters are kept in the database instead
+# (core.RateLimitCounter).
+RATELIMIT_ENABLED = True
+
+# Background tasks (core.tasks). In development tasks run inline, in
+# production they are executed by `manage.py run_workers`.
+TASKS_EAGER = True
+TASKS_RETRY_DELAY = 10
+TASKS_STALE_TIMEOUT = 600
+
+# Memory profiling with tracemalloc (core.memprofile): when enabled, a
+# MEMPROFILE_SAMPLE_RATE share of requests is profiled and growth since
+# process start is shown to staff at /admin/memprofile/. Tracing slows
+# every allocation, so keep it off unless investigating.
+MEMPROFILE_ENABLED = False
+MEMPROFILE_SAMPLE_RATE = 0.01
+
+# Slow query log
+# File handlers below open their files lazily (delay=True); the
+# directories are created on startup by core.apps.CoreConfig.ready.
+LOG_DIR = os.path.join(BASE_DIR, 'logs')
+
+SLOW_QUERY_LOG_FILE = os.path.join(LOG_DIR, 'slow_queries.log')
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_SAMPLE_RATE = 0.01
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {
+            'format': '%(message)s',
+        },
+    },
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG_FILE,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'formatter': 'message',
+        },
+        'memprofile': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': os.path.join(LOG_DIR, 'memprofile.log'),
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 2,
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'yatube.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'yatube.memprofile': {
+            'handlers': ['memprofile'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
@@ -0,0 +1,99 @@
+"""
+Production settings for yatube project.
+
+Select with ``DJANGO_SETTINGS_MODULE=yatube.settings_production``.
+Everything not overridden here is inherited from ``yatube.settings``.
+"""
+
+import copy
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES, SESSION_ENGINES, TEMPLATES
+
+try:
+    SECRET_KEY = os.environ['SECRET_KEY']
+except KeyError:
+    raise ImproperlyConfigured('Set the SECRET_KEY environment variable')
+
+DEBUG = os.getenv('DEBUG', '0') == '1'
+
+ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+# Persistent connections: one connection per worker thread is reused
+# between requests instead of being opened and closed every time.
+DATABASES = copy.deepcopy(DATABASES)
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = int(os.getenv('CONN_MAX_AGE', 600))
+
+# Compiled templates are kept in memory for the lifetime of the process.
+TEMPLATES = copy.deepcopy(TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+TEMPLATES[0]['OPTIONS']['context_processors'].remove(
+    'django.template.context_processors.debug'
+)
+
+# Static and media files are served by the front server. collectstatic
+# adds a content hash to static file names and writes .gz/.br copies;
+# set SERVE_STATIC=1 to serve them from the app without a front server.
+STATIC_ROOT = os.getenv('STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+SERVE_STATIC = os.getenv('SERVE_STATIC', '0') == '1'
+MEDIA_ROOT = os.getenv('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+SERVE_MEDIA = os.getenv('SERVE_MEDIA', '1') == '1'
+MEDIA_SENDFILE = os.getenv('MEDIA_SENDFILE', '')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv(
+    'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
+# The local-memory cache is private to a process, so pages cached by one
+# worker are useless to the others. Use memcached when available and a
+# shared file-based cache otherwise.
+CACHE_TIMEOUT = int(os.getenv('CACHE_TIMEOUT', 300))
+
+if os.getenv('MEMCACHED_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': os.environ['MEMCACHED_LOCATION'].split(','),
+            'TIMEOUT': CACHE_TIMEOUT,
+            'KEY_PREFIX': 'yatube',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv(
+                'CACHE_DIR', os.path.join(BASE_DIR, 'cache')
+            ),
+            'TIMEOUT': CACHE_TIMEOUT,
+            'KEY_PREFIX': 'yatube',
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+                'CULL_FREQUENCY': 4,
+            },
+        }
+    }
+
+SESSION_ENGINE = SESSION_ENGINES[os.getenv('SESSION_MODE', 'cached_db')]
+SESSION_COOKIE_SECURE = os.getenv('SECURE_COOKIES', '1') == '1'
+CSRF_COOKIE_SECURE = SESSION_COOKIE_SECURE
+
+TASKS_EAGER = False
+
+SNAPSHOTS_ENABLED = os.getenv('SNAPSHOTS_ENABLED', '1') == '1'
+SNAPSHOT_ROOT = os.getenv(
+    'SNAPSHOT_ROOT', os.path.join(BASE_DIR, 'snapshots'))
+
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv('SLOW_QUERY_SAMPLE_RATE', 0.001))
+
+MEMPROFILE_ENABLED = os.getenv('MEMPROFILE_ENABLED', '0') == '1'
+MEMPROFILE_SAMPLE_RATE = float(os.getenv('MEMPROFILE_SAMPLE_RATE', 0.01))
@@ -0,0 +1,29 @@
+"""
+Test settings for yatube project.
+
+Used by `manage.py test` and pytest. Everything not overridden here is
+inherited from ``yatube.settings``.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+# PBKDF2 is deliberately slow; fixtures do not need a strong hash.
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+# Uploaded images never touch the disk.
+DEFAULT_FILE_STORAGE = 'core.storage.InMemoryStorage'
+
+# SQLite test databases are created in memory. With --parallel each
+# worker process gets its own copy of the database.
+TEST_RUNNER = 'core.test_runner.ParallelDiscoverRunner'
+
+# Pages cached by one test must not leak into the next one. Tests of
+# cache-backed features override CACHES explicitly.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    }
+}
+
+SLOW_QUERY_SAMPLE_RATE = 0
+TASKS_EAGER = True